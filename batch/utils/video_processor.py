@@ -1,6 +1,7 @@
 import os
 from core.st_utils.imports_and_utils import *
 from core.utils.onekeycleanup import cleanup
+from core.utils.gpt_cache import close_cache
 from core.utils import load_key
 import shutil
 from functools import partial
@@ -26,21 +27,25 @@ def process_video(file, dubbing=False, is_retry=False):
         ("✂️ Splitting sentences", split_sentences),
         ("📝 Summarizing and translating", summarize_and_translate),
         ("⚡ Processing and aligning subtitles", process_and_align_subtitles),
-        ("🎬 Merging subtitles to video", _7_sub_into_vid.merge_subtitles_to_video),
     ]
     
     if dubbing:
+        # both videos are rendered at the end from a single decode of the source
         dubbing_steps = [
             ("🔊 Generating audio tasks", gen_audio_tasks),
             ("🎵 Extracting reference audio", _9_refer_audio.extract_refer_audio_main),
             ("🗣️ Generating audio", _10_gen_audio.gen_audio),
             ("🔄 Merging full audio", _11_merge_audio.merge_full_audio),
-            ("🎞️ Merging dubbing to video", _12_dub_to_vid.merge_video_audio),
+            ("🎞️ Rendering subtitle and dubbed videos", _12_dub_to_vid.render_sub_and_dub_videos),
         ]
         text_steps.extend(dubbing_steps)
+    else:
+        text_steps.append(("🎬 Merging subtitles to video", _7_sub_into_vid.merge_subtitles_to_video))
     
+    # with dubbing, output_sub.mp4 is only rendered by the last step
+    first_dubbing_step = len(text_steps) - len(dubbing_steps) if dubbing else len(text_steps)
     current_step = ""
-    for step_name, step_func in text_steps:
+    for step_index, (step_name, step_func) in enumerate(text_steps):
         current_step = step_name
         for attempt in range(3):
             try:
@@ -60,6 +65,8 @@ def process_video(file, dubbing=False, is_retry=False):
                         border_style="red"
                     )
                     console.print(error_panel)
+                    if step_index >= first_dubbing_step:
+                        render_sub_video_after_failure()
                     cleanup(ERROR_OUTPUT_DIR)
                     return False, current_step, str(e)
                 console.print(Panel(
@@ -71,7 +78,15 @@ def process_video(file, dubbing=False, is_retry=False):
     cleanup(SAVE_DIR)
     return True, "", ""
 
+def render_sub_video_after_failure():
+    """Dubbing failed after the subtitles were done: still deliver output_sub.mp4 like the non-dubbing flow"""
+    try:
+        _7_sub_into_vid.merge_subtitles_to_video()
+    except Exception as e:
+        console.print(f"[red]Failed to render the subtitle video: {e}[/red]")
+
 def prepare_output_folder(output_folder):
+    close_cache()
     if os.path.exists(output_folder):
         shutil.rmtree(output_folder)
     os.makedirs(output_folder)
@@ -1,67 +1,23 @@
 import os
-import time
-import shutil
-import subprocess
 from typing import Tuple
 
 import pandas as pd
-from pydub import AudioSegment
 from rich.console import Console
 from rich.progress import Progress
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 from core.utils import *
 from core.utils.models import *
-from core.asr_backend.audio_preprocess import get_audio_duration
+from core.utils.config_utils import in_job_context
+from core.utils.gpu_memory import release_gpu_memory
+from core.asr_backend.media_info import get_audio_duration
 from core.tts_backend.tts_main import tts_main
+from core.tts_backend.dub_stretch import TEMP_FILE_TEMPLATE, process_dub_chunk
 
 console = Console()
 
-TEMP_FILE_TEMPLATE = f"{_AUDIO_TMP_DIR}/{{}}_temp.wav"
-OUTPUT_FILE_TEMPLATE = f"{_AUDIO_SEGS_DIR}/{{}}.wav"
 WARMUP_SIZE = 5
 
-def parse_df_srt_time(time_str: str) -> float:
-    """Convert SRT time format to seconds"""
-    hours, minutes, seconds = time_str.strip().split(':')
-    seconds, milliseconds = seconds.split('.')
-    return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(milliseconds) / 1000
-
-def adjust_audio_speed(input_file: str, output_file: str, speed_factor: float) -> None:
-    """Adjust audio speed and handle edge cases"""
-    # If the speed factor is close to 1, directly copy the file
-    if abs(speed_factor - 1.0) < 0.001:
-        shutil.copy2(input_file, output_file)
-        return
-        
-    atempo = speed_factor
-    cmd = ['ffmpeg', '-i', input_file, '-filter:a', f'atempo={atempo}', '-y', output_file]
-    input_duration = get_audio_duration(input_file)
-    max_retries = 2
-    for attempt in range(max_retries):
-        try:
-            subprocess.run(cmd, check=True, stderr=subprocess.PIPE)
-            output_duration = get_audio_duration(output_file)
-            expected_duration = input_duration / speed_factor
-            diff = output_duration - expected_duration
-            # If the output duration exceeds the expected duration, but the input audio is less than 3 seconds, and the error is within 0.1 seconds, truncate to the expected length
-            if output_duration >= expected_duration * 1.02 and input_duration < 3 and diff <= 0.1:
-                audio = AudioSegment.from_wav(output_file)
-                trimmed_audio = audio[:(expected_duration * 1000)]  # pydub uses milliseconds
-                trimmed_audio.export(output_file, format="wav")
-                print(f"✂️ Trimmed to expected duration: {expected_duration:.2f} seconds")
-                return
-            elif output_duration >= expected_duration * 1.02:
-                raise Exception(f"Audio duration abnormal: input file={input_file}, output file={output_file}, speed factor={speed_factor}, input duration={input_duration:.2f}s, output duration={output_duration:.2f}s")
-            return
-        except subprocess.CalledProcessError as e:
-            if attempt < max_retries - 1:
-                rprint(f"[yellow]⚠️ Audio speed adjustment failed, retrying in 1s ({attempt + 1}/{max_retries})[/yellow]")
-                time.sleep(1)
-            else:
-                rprint(f"[red]❌ Audio speed adjustment failed, max retries reached ({max_retries})[/red]")
-                raise e
-
 def process_row(row: pd.Series, tasks_df: pd.DataFrame) -> Tuple[int, float]:
     """Helper function for processing single row data"""
     number = row['number']
@@ -99,7 +55,7 @@ def generate_tts_audio(tasks_df: pd.DataFrame) -> pd.DataFrame:
             remaining_tasks = tasks_df.iloc[warmup_size:].copy()
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = [
-                    executor.submit(process_row, row, tasks_df.copy())
+                    executor.submit(in_job_context(process_row), row, tasks_df.copy())
                     for _, row in remaining_tasks.iterrows()
                 ]
                 
@@ -115,100 +71,41 @@ def generate_tts_audio(tasks_df: pd.DataFrame) -> pd.DataFrame:
     rprint("[bold green]✨ TTS audio generation completed![/bold green]")
     return tasks_df
 
-def process_chunk(chunk_df: pd.DataFrame, accept: float, min_speed: float) -> tuple[float, bool]:
-    """Process audio chunk and calculate speed factor"""
-    chunk_durs = chunk_df['real_dur'].sum()
-    tol_durs = chunk_df['tol_dur'].sum()
-    durations = tol_durs - chunk_df.iloc[-1]['tolerance']
-    all_gaps = chunk_df['gap'].sum() - chunk_df.iloc[-1]['gap']
-    
-    keep_gaps = True
-    speed_var_error = 0.1
-
-    if (chunk_durs + all_gaps) / accept < durations:
-        speed_factor = max(min_speed, (chunk_durs + all_gaps) / (durations-speed_var_error))
-    elif chunk_durs / accept < durations:
-        speed_factor = max(min_speed, chunk_durs / (durations-speed_var_error))
-        keep_gaps = False
-    elif (chunk_durs + all_gaps) / accept < tol_durs:
-        speed_factor = max(min_speed, (chunk_durs + all_gaps) / (tol_durs-speed_var_error))
-    else:
-        speed_factor = chunk_durs / (tol_durs-speed_var_error)
-        keep_gaps = False
-        
-    return round(speed_factor, 3), keep_gaps
-
 def merge_chunks(tasks_df: pd.DataFrame) -> pd.DataFrame:
     """Merge audio chunks and adjust timeline"""
     rprint("[bold blue]🔄 Starting audio chunks processing...[/bold blue]")
     accept = load_key("speed_factor.accept")
     min_speed = load_key("speed_factor.min")
-    chunk_start = 0
-    
+
     tasks_df['new_sub_times'] = None
-    
-    for index, row in tasks_df.iterrows():
-        if row['cut_off'] == 1:
-            chunk_df = tasks_df.iloc[chunk_start:index+1].reset_index(drop=True)
-            speed_factor, keep_gaps = process_chunk(chunk_df, accept, min_speed)
-            
-            # 🎯 Step1: Start processing new timeline
-            chunk_start_time = parse_df_srt_time(chunk_df.iloc[0]['start_time'])
-            chunk_end_time = parse_df_srt_time(chunk_df.iloc[-1]['end_time']) + chunk_df.iloc[-1]['tolerance'] # 加上tolerance才是这一块的结束
-            cur_time = chunk_start_time
-            for i, row in chunk_df.iterrows():
-                # If i is not 0, which is not the first row of the chunk, cur_time needs to be added with the gap of the previous row, remember to divide by speed_factor
-                if i != 0 and keep_gaps:
-                    cur_time += chunk_df.iloc[i-1]['gap']/speed_factor
-                new_sub_times = []
-                number = row['number']
-                lines = eval(row['lines']) if isinstance(row['lines'], str) else row['lines']
-                for line_index, line in enumerate(lines):
-                    # 🔄 Step2: Start speed change and save as OUTPUT_FILE_TEMPLATE
-                    temp_file = TEMP_FILE_TEMPLATE.format(f"{number}_{line_index}")
-                    output_file = OUTPUT_FILE_TEMPLATE.format(f"{number}_{line_index}")
-                    adjust_audio_speed(temp_file, output_file, speed_factor)
-                    ad_dur = get_audio_duration(output_file)
-                    new_sub_times.append([cur_time, cur_time+ad_dur])
-                    cur_time += ad_dur
-                # 🔄 Step3: Find corresponding main DataFrame index and update new_sub_times
-                main_df_idx = tasks_df[tasks_df['number'] == row['number']].index[0]
-                tasks_df.at[main_df_idx, 'new_sub_times'] = new_sub_times
-                # 🎯 Step4: Choose emoji based on speed_factor and accept comparison
-                emoji = "⚡" if speed_factor <= accept else "⚠️"
-                rprint(f"[cyan]{emoji} Processed chunk {chunk_start} to {index} with speed factor {speed_factor}[/cyan]")
-            # 🔄 Step5: Check if the last row exceeds the range
-            if cur_time > chunk_end_time:
-                time_diff = cur_time - chunk_end_time
-                if time_diff <= 0.6:  # If exceeding time is within 0.6 seconds, truncate the last audio
-                    rprint(f"[yellow]⚠️ Chunk {chunk_start} to {index} exceeds by {time_diff:.3f}s, truncating last audio[/yellow]")
-                    # Get the last audio file
-                    last_number = tasks_df.iloc[index]['number']
-                    last_lines = eval(tasks_df.iloc[index]['lines']) if isinstance(tasks_df.iloc[index]['lines'], str) else tasks_df.iloc[index]['lines']
-                    last_line_index = len(last_lines) - 1
-                    last_file = OUTPUT_FILE_TEMPLATE.format(f"{last_number}_{last_line_index}")
-                    
-                    # Calculate the duration to keep
-                    audio = AudioSegment.from_wav(last_file)
-                    original_duration = len(audio) / 1000  # Convert to seconds
-                    new_duration = original_duration - time_diff
-                    trimmed_audio = audio[:(new_duration * 1000)]  # pydub uses milliseconds
-                    trimmed_audio.export(last_file, format="wav")
-                    
-                    # Update the last timestamp
-                    last_times = tasks_df.at[index, 'new_sub_times']
-                    last_times[-1][1] = chunk_end_time
-                    tasks_df.at[index, 'new_sub_times'] = last_times
-                else:
-                    raise Exception(f"Chunk {chunk_start} to {index} exceeds the chunk end time {chunk_end_time:.2f} seconds with current time {cur_time:.2f} seconds")
-            chunk_start = index+1
-    
+    # every cut_off row closes a chunk
+    bounds, chunk_start = [], 0
+    for index in tasks_df.index[tasks_df['cut_off'] == 1]:
+        pos = tasks_df.index.get_loc(index)
+        bounds.append((chunk_start, pos))
+        chunk_start = pos + 1
+    if not bounds:
+        return tasks_df
+
+    # chunks are independent: stretch them on all cores, then write results back in chunk order.
+    # wsola is a per-frame python loop, so threads would share one GIL; the worker lives in the light
+    # dub_stretch module, so a spawned process (Windows, macOS) does not import any tts backend
+    max_workers = min(os.cpu_count() or 1, len(bounds))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(process_dub_chunk, tasks_df.iloc[start:end+1], accept, min_speed, f"{start} to {end}")
+                   for start, end in bounds]
+        for (start, end), future in zip(bounds, futures):
+            _, all_sub_times = future.result()
+            for offset, new_sub_times in enumerate(all_sub_times):
+                tasks_df.at[tasks_df.index[start + offset], 'new_sub_times'] = new_sub_times
+
     rprint("[bold green]✅ Audio chunks processing completed![/bold green]")
     return tasks_df
 
 def gen_audio() -> None:
     """Main function: Generate audio and process timeline"""
     rprint("[bold magenta]🚀 Starting audio generation process...[/bold magenta]")
+    release_gpu_memory("before TTS")
     
     # 🎯 Step1: Create necessary directories
     os.makedirs(_AUDIO_TMP_DIR, exist_ok=True)
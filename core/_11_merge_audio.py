@@ -1,14 +1,16 @@
 import os
 import pandas as pd
 import subprocess
-from pydub import AudioSegment
+import numpy as np
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 from rich.console import Console
 from core.utils import *
 from core.utils.models import *
+from core.tts_backend.time_stretch import read_audio
 console = Console()
 
 DUB_VOCAL_FILE = 'output/dub.mp3'
+DUB_NORMALIZED_FILE = 'output/normalized_dub.wav'
 
 DUB_SUB_FILE = 'output/dub.srt'
 OUTPUT_FILE_TEMPLATE = f"{_AUDIO_SEGS_DIR}/{{}}.wav"
@@ -35,53 +37,62 @@ def get_audio_files(df):
             audios.append(temp_file)
     return audios
 
-def process_audio_segment(audio_file):
-    """Process a single audio segment with MP3 compression"""
-    temp_file = f"{audio_file}_temp.mp3"
-    ffmpeg_cmd = [
-        'ffmpeg', '-y',
-        '-i', audio_file,
-        '-ar', '16000',
-        '-ac', '1',
-        '-b:a', '64k',
-        temp_file
-    ]
-    subprocess.run(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    audio_segment = AudioSegment.from_mp3(temp_file)
-    os.remove(temp_file)
-    return audio_segment
+def process_audio_segment(audio_file, sample_rate):
+    """Load a single segment as mono float32 samples at `sample_rate`"""
+    # segments at another rate are resampled by ffmpeg while decoding
+    samples, _ = read_audio(audio_file, sample_rate=sample_rate)
+    return samples.mean(axis=1)
 
 def merge_audio_segments(audios, new_sub_times, sample_rate):
-    merged_audio = AudioSegment.silent(duration=0, frame_rate=sample_rate)
+    """Write every segment at its new_sub_times offset into one preallocated timeline"""
+    total = int(round(max(end for _, end in new_sub_times) * sample_rate)) if new_sub_times else 0
+    merged_audio = np.zeros(total, dtype=np.float32)
     
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), TaskProgressColumn()) as progress:
         merge_task = progress.add_task("🎵 Merging audio segments...", total=len(audios))
         
-        for i, (audio_file, time_range) in enumerate(zip(audios, new_sub_times)):
+        for audio_file, (start_time, _) in zip(audios, new_sub_times):
             if not os.path.exists(audio_file):
                 console.print(f"[bold yellow]⚠️  Warning: File {audio_file} does not exist, skipping...[/bold yellow]")
                 progress.advance(merge_task)
                 continue
                 
-            audio_segment = process_audio_segment(audio_file)
-            start_time, end_time = time_range
-            
-            # Add silence segment
-            if i > 0:
-                prev_end = new_sub_times[i-1][1]
-                silence_duration = start_time - prev_end
-                if silence_duration > 0:
-                    silence = AudioSegment.silent(duration=int(silence_duration * 1000), frame_rate=sample_rate)
-                    merged_audio += silence
-            elif start_time > 0:
-                silence = AudioSegment.silent(duration=int(start_time * 1000), frame_rate=sample_rate)
-                merged_audio += silence
-                
-            merged_audio += audio_segment
+            audio_segment = process_audio_segment(audio_file, sample_rate)
+            start = int(round(start_time * sample_rate))
+            end = start + len(audio_segment)
+            if end > len(merged_audio):
+                # a segment may run a few samples past the last subtitle end
+                merged_audio = np.pad(merged_audio, (0, end - len(merged_audio)))
+            merged_audio[start:end] += audio_segment
             progress.advance(merge_task)
     
     return merged_audio
 
+def encode_audio(samples, sample_rate, output_file, normalized_file=None, target_db=-20.0, bitrate="64k", block_seconds=60):
+    """Stream a mono float32 timeline into one ffmpeg process.
+
+    With `normalized_file` the same pass also writes a wav gained to `target_db` dBFS (same rule as
+    normalize_audio_volume), so the mix stage does not have to decode and re-encode dub.mp3 again.
+    """
+    cmd = ['ffmpeg', '-y', '-v', 'error', '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', '-',
+           '-map', '0:a', '-c:a', 'libmp3lame', '-b:a', bitrate, output_file]
+    if normalized_file:
+        block = sample_rate * block_seconds
+        mean_sq = sum(float(np.dot(samples[i:i + block], samples[i:i + block])) for i in range(0, len(samples), block)) / max(len(samples), 1)
+        dbfs = 10 * np.log10(mean_sq) if mean_sq > 0 else target_db
+        cmd += ['-map', '0:a', '-af', f'volume={target_db - dbfs:.4f}dB', '-c:a', 'pcm_s16le', normalized_file]
+        rprint(f"[green]✅ Dub audio normalized from {dbfs:.1f}dB to {target_db:.1f}dB[/green]")
+    encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    # write block by block, so only one block is ever converted to bytes at a time
+    for i in range(0, len(samples), sample_rate * block_seconds):
+        encoder.stdin.write(np.clip(samples[i:i + sample_rate * block_seconds], -1, 1).astype('<f4').tobytes())
+    encoder.stdin.close()
+    if encoder.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed to encode {output_file}")
+    if normalized_file:
+        # mark the normalized track as at least as new as the mp3 it was made with
+        os.utime(normalized_file)
+
 def create_srt_subtitle():
     df, lines, new_sub_times = load_and_flatten_data(_8_1_AUDIO_TASK)
     
@@ -122,8 +133,7 @@ def merge_full_audio():
     merged_audio = merge_audio_segments(audios, new_sub_times, sample_rate)
     
     with console.status("[bold cyan]💾 Exporting final audio file...[/bold cyan]"):
-        merged_audio = merged_audio.set_frame_rate(16000).set_channels(1)
-        merged_audio.export(DUB_VOCAL_FILE, format="mp3", parameters=["-b:a", "64k"])
+        encode_audio(merged_audio, sample_rate, DUB_VOCAL_FILE, normalized_file=DUB_NORMALIZED_FILE)
     console.print(f"[bold green]✅ Audio file successfully merged![/bold green]")
     console.print(f"[bold green]📁 Output file: {DUB_VOCAL_FILE}[/bold green]")
 
@@ -1,14 +1,16 @@
+import os
 import platform
-import subprocess
-
 import cv2
 import numpy as np
 from rich.console import Console
 
 from core._1_ytdlp import find_video_files
+from core._7_sub_into_vid import merge_subtitles_to_video, sub_video_target, OUTPUT_VIDEO as SUB_VIDEO
 from core.asr_backend.audio_preprocess import normalize_audio_volume
+from core.asr_backend.demucs_vl import get_stem
 from core.utils import *
 from core.utils.models import *
+from core.utils.video_render import RenderTarget, render
 
 console = Console()
 
@@ -31,7 +33,6 @@ TRANS_BACK_COLOR = '&H33000000'
 def merge_video_audio():
     """Merge video and audio, and reduce video volume"""
     VIDEO_FILE = find_video_files()
-    background_file = _BACKGROUND_AUDIO_FILE
     
     if not load_key("burn_subtitles"):
         rprint("[bold yellow]Warning: A 0-second black video will be generated as a placeholder as subtitles are not burned in.[/bold yellow]")
@@ -46,43 +47,37 @@ def merge_video_audio():
         rprint("[bold green]Placeholder video has been generated.[/bold green]")
         return
 
-    # Normalize dub audio
+    render(VIDEO_FILE, [dub_video_target()], gpu=load_key("ffmpeg_gpu"))
+    rprint(f"[bold green]Video and audio successfully merged into {DUB_VIDEO}[/bold green]")
+
+def dub_video_target():
+    """output_dub.mp4: dub subtitles burned in, background mixed with the normalized dub track"""
+    background_file = get_stem("background")
+
+    # Normalized dub audio is written together with dub.mp3; only redo it if it is missing or stale
     normalized_dub_audio = 'output/normalized_dub.wav'
-    normalize_audio_volume(DUB_AUDIO, normalized_dub_audio)
-    
-    # Merge video and audio with translated subtitles
-    video = cv2.VideoCapture(VIDEO_FILE)
-    TARGET_WIDTH = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
-    TARGET_HEIGHT = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    video.release()
-    rprint(f"[bold green]Video resolution: {TARGET_WIDTH}x{TARGET_HEIGHT}[/bold green]")
-    
+    if not os.path.exists(normalized_dub_audio) or os.path.getmtime(normalized_dub_audio) < os.path.getmtime(DUB_AUDIO):
+        normalize_audio_volume(DUB_AUDIO, normalized_dub_audio)
+
     subtitle_filter = (
         f"subtitles={DUB_SUB_FILE}:force_style='FontSize={TRANS_FONT_SIZE},"
         f"FontName={TRANS_FONT_NAME},PrimaryColour={TRANS_FONT_COLOR},"
         f"OutlineColour={TRANS_OUTLINE_COLOR},OutlineWidth={TRANS_OUTLINE_WIDTH},"
         f"BackColour={TRANS_BACK_COLOR},Alignment=2,MarginV=27,BorderStyle=4'"
     )
-    
-    cmd = [
-        'ffmpeg', '-y', '-i', VIDEO_FILE, '-i', background_file, '-i', normalized_dub_audio,
-        '-filter_complex',
-        f'[0:v]scale={TARGET_WIDTH}:{TARGET_HEIGHT}:force_original_aspect_ratio=decrease,'
-        f'pad={TARGET_WIDTH}:{TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2,'
-        f'{subtitle_filter}[v];'
-        f'[1:a][2:a]amix=inputs=2:duration=first:dropout_transition=3[a]'
-    ]
+    return RenderTarget(DUB_VIDEO, video_filter=subtitle_filter,
+                        audio_inputs=[background_file, normalized_dub_audio],
+                        audio_filter="{0}{1}amix=inputs=2:duration=first:dropout_transition=3",
+                        audio_args=['-c:a', 'aac', '-b:a', '96k'])
 
-    if load_key("ffmpeg_gpu"):
-        rprint("[bold green]Using GPU acceleration...[/bold green]")
-        cmd.extend(['-map', '[v]', '-map', '[a]', '-c:v', 'h264_nvenc'])
-    else:
-        cmd.extend(['-map', '[v]', '-map', '[a]'])
-    
-    cmd.extend(['-c:a', 'aac', '-b:a', '96k', DUB_VIDEO])
-    
-    subprocess.run(cmd)
-    rprint(f"[bold green]Video and audio successfully merged into {DUB_VIDEO}[/bold green]")
+def render_sub_and_dub_videos():
+    """Render output_sub.mp4 and output_dub.mp4 from a single decode of the source video"""
+    if not load_key("burn_subtitles"):
+        merge_subtitles_to_video()
+        merge_video_audio()
+        return
+    render(find_video_files(), [sub_video_target(), dub_video_target()], gpu=load_key("ffmpeg_gpu"))
+    rprint(f"[bold green]Subtitle and dubbed videos rendered into {SUB_VIDEO} and {DUB_VIDEO}[/bold green]")
 
 if __name__ == '__main__':
     merge_video_audio()
@@ -1,8 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from core.utils import *
-from core.asr_backend.demucs_vl import demucs_audio
+from core.asr_backend.demucs_vl import get_stem
 from core.asr_backend.audio_preprocess import process_transcription, convert_video_to_audio, split_audio, save_results, normalize_audio_volume
 from core._1_ytdlp import find_video_files
 from core.utils.models import *
+from core.utils.config_utils import in_job_context
 
 @check_file_exists(_2_CLEANED_CHUNKS)
 def transcribe():
@@ -12,8 +14,7 @@ def transcribe():
 
     # 2. Demucs vocal separation:
     if load_key("demucs"):
-        demucs_audio()
-        vocal_audio = normalize_audio_volume(_VOCAL_AUDIO_FILE, _VOCAL_AUDIO_FILE, format="mp3")
+        vocal_audio = normalize_audio_volume(get_stem("vocals"), _VOCAL_AUDIO_FILE, format="mp3")
     else:
         vocal_audio = _RAW_AUDIO_FILE
 
@@ -33,9 +34,16 @@ def transcribe():
         from core.asr_backend.elevenlabs_asr import transcribe_audio_elevenlabs as ts
         rprint("[cyan]🎤 Transcribing audio with ElevenLabs API...[/cyan]")
 
-    for start, end in segments:
-        result = ts(_RAW_AUDIO_FILE, vocal_audio, start, end)
-        all_results.append(result)
+    if runtime in ("cloud", "elevenlabs") and len(segments) > 1:
+        # remote segments are independent uploads; per-segment json logs keep this resumable
+        max_workers = min(load_key("whisper.max_concurrent_segments"), len(segments))
+        rprint(f"[cyan]🚀 Transcribing {len(segments)} segments with {max_workers} concurrent requests...[/cyan]")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_results = list(executor.map(in_job_context(lambda seg: ts(_RAW_AUDIO_FILE, vocal_audio, seg[0], seg[1])), segments))
+    else:
+        for start, end in segments:
+            result = ts(_RAW_AUDIO_FILE, vocal_audio, start, end)
+            all_results.append(result)
     
     # 5. Combine results
     combined_result = {'segments': []}
@@ -1,26 +1,37 @@
-import concurrent.futures
+import asyncio
+import itertools
+import unicodedata
 from difflib import SequenceMatcher
 import math
 from core.prompts import get_split_prompt
 from core.spacy_utils.load_nlp_model import init_nlp
+from core.spacy_utils.nlp_runner import run_pipe, token_counts
 from core.utils import *
 from rich.console import Console
 from rich.table import Table
 from core.utils.models import _3_1_SPLIT_BY_NLP, _3_2_SPLIT_BY_MEANING
+from core.utils.llm_engine import ask_gpt_async, run_sync, run_tasks
 console = Console()
 
 def tokenize_sentence(sentence, nlp):
-    doc = nlp(sentence)
+    doc = run_pipe([sentence], "tokenize", nlp)[0]
     return [token.text for token in doc]
 
-def find_split_positions(original, modified):
+def _normalize(text):
+    """Whitespace-free NFKC text plus, for each kept char, its index in `text`"""
+    chars, offsets = [], []
+    for i, ch in enumerate(text):
+        if ch.isspace():
+            continue
+        for norm in unicodedata.normalize('NFKC', ch).lower():
+            chars.append(norm)
+            offsets.append(i)
+    return ''.join(chars), offsets
+
+def _fuzzy_split_positions(original, parts, joiner):
+    """Previous similarity search: slow, only used when the LLM rewrote too much to align"""
     split_positions = []
-    parts = modified.split('[br]')
     start = 0
-    whisper_language = load_key("whisper.language")
-    language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language
-    joiner = get_joiner(language)
-
     for i in range(len(parts) - 1):
         max_similarity = 0
         best_split = None
@@ -45,21 +56,71 @@ def find_split_positions(original, modified):
 
     return split_positions
 
-def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0):
+def find_split_positions(original, modified, joiner=None, min_ratio=0.6):
+    """Map the [br] marks of `modified` onto character offsets of `original`.
+
+    Both sides are normalized (whitespace dropped, NFKC, lower case). If they are equal each mark maps
+    directly through the offset table, which is linear. Otherwise one SequenceMatcher diff of the normalized
+    texts aligns them (quadratic in the worst case, but over one sentence); only a poor alignment falls back
+    to the fuzzy search.
+    """
+    parts = modified.split('[br]')
+    norm_original, offsets = _normalize(original)
+    norm_parts = [_normalize(part)[0] for part in parts]
+    norm_modified = ''.join(norm_parts)
+    # boundaries in normalized modified text: chars before each [br]
+    boundaries = list(itertools.accumulate(len(part) for part in norm_parts[:-1]))
+
+    if norm_modified == norm_original:
+        aligned = boundaries
+    else:
+        matcher = SequenceMatcher(None, norm_original, norm_modified, autojunk=False)
+        ratio = matcher.ratio()
+        if ratio < min_ratio:
+            console.print(f"[yellow]Warning: split result differs too much from the original ({ratio:.2f}), using fuzzy search[/yellow]")
+            if joiner is None:
+                whisper_language = load_key("whisper.language")
+                joiner = get_joiner(load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language)
+            return _fuzzy_split_positions(original, parts, joiner)
+        opcodes = matcher.get_opcodes()
+        aligned = []
+        for k in boundaries:
+            for n, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+                if j1 <= k <= j2:
+                    # inside an equal block the offset is exact, elsewhere interpolate across the edit
+                    pos = i1 + (k - j1) if tag == 'equal' else i1 + round((k - j1) * (i2 - i1) / max(j2 - j1, 1))
+                    # the LLM dropped what follows the boundary (typically the punctuation before [br]):
+                    # keep it on the left line instead of starting the next one with it
+                    if k == j2 and n + 1 < len(opcodes) and opcodes[n + 1][0] == 'delete':
+                        pos = opcodes[n + 1][2]
+                    aligned.append(pos)
+                    break
+
+    split_positions = []
+    prev = 0
+    for k in aligned:
+        # cut right after the last original char of the left part
+        pos = offsets[k - 1] + 1 if 0 < k <= len(offsets) else (0 if k <= 0 else len(original))
+        prev = max(prev, pos)
+        split_positions.append(prev)
+    return split_positions
+
+def valid_split(response_data):
+    choice = response_data["choice"]
+    if f'split{choice}' not in response_data:
+        return {"status": "error", "message": "Missing required key: `split`"}
+    if "[br]" not in response_data[f"split{choice}"]:
+        return {"status": "error", "message": "Split failed, no [br] found"}
+    return {"status": "success", "message": "Split completed"}
+
+async def split_sentence_async(sentence, num_parts, word_limit=20, index=-1, bypass_cache=False):
     """Split a long sentence using GPT and return the result as a string."""
     split_prompt = get_split_prompt(sentence, num_parts, word_limit)
-    def valid_split(response_data):
-        choice = response_data["choice"]
-        if f'split{choice}' not in response_data:
-            return {"status": "error", "message": "Missing required key: `split`"}
-        if "[br]" not in response_data[f"split{choice}"]:
-            return {"status": "error", "message": "Split failed, no [br] found"}
-        return {"status": "success", "message": "Split completed"}
-    
-    response_data = ask_gpt(split_prompt + " " * retry_attempt, resp_type='json', valid_def=valid_split, log_title='split_by_meaning')
+    response_data = await ask_gpt_async(split_prompt, resp_type='json', valid_def=valid_split, log_title='split_by_meaning', bypass_cache=bypass_cache)
     choice = response_data["choice"]
     best_split = response_data[f"split{choice}"]
-    split_points = find_split_positions(sentence, best_split)
+    # keep the cpu-bound alignment off the engine loop
+    split_points = await asyncio.to_thread(find_split_positions, sentence, best_split)
     # split the sentence based on the split points
     for i, split_point in enumerate(split_points):
         if i == 0:
@@ -80,32 +141,37 @@ def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0
     
     return best_split
 
-def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_attempt=0):
-    """Split sentences in parallel using a thread pool."""
-    new_sentences = [None] * len(sentences)
-    futures = []
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for index, sentence in enumerate(sentences):
-            # Use tokenizer to split the sentence
-            tokens = tokenize_sentence(sentence, nlp)
-            # print("Tokenization result:", tokens)
-            num_parts = math.ceil(len(tokens) / max_length)
-            if len(tokens) > max_length:
-                future = executor.submit(split_sentence, sentence, num_parts, max_length, index=index, retry_attempt=retry_attempt)
-                futures.append((future, index, num_parts, sentence))
-            else:
-                new_sentences[index] = [sentence]
-
-        for future, index, num_parts, sentence in futures:
-            split_result = future.result()
-            if split_result:
-                split_lines = split_result.strip().split('\n')
-                new_sentences[index] = [line.strip() for line in split_lines]
-            else:
-                new_sentences[index] = [sentence]
-
-    return [sentence for sublist in new_sentences for sentence in sublist]
+def split_sentence(sentence, num_parts, word_limit=20, index=-1, bypass_cache=False):
+    return run_sync(split_sentence_async(sentence, num_parts, word_limit, index=index, bypass_cache=bypass_cache))
+
+class SplitItem:
+    """One line of the output with its token count and how many times it was already sent to the LLM."""
+
+    def __init__(self, text, tokens, attempts=0):
+        self.text = text
+        self.tokens = tokens
+        self.attempts = attempts
+
+def _split_item(item, result, nlp):
+    """Replace `item` by the lines of `result`; only the new fragments are tokenized."""
+    lines = [line.strip() for line in result.strip().split('\n')] if result else []
+    if len(lines) <= 1:
+        # nothing was split: retry the same text, but never hand it the cached answer again
+        return [SplitItem(item.text, item.tokens, item.attempts + 1)]
+    return [SplitItem(line, n) for line, n in zip(lines, token_counts(lines, nlp))]
+
+def parallel_split_sentences(items, max_length, nlp, max_attempts=3):
+    """One round over the work queue: only items still over `max_length` go to the shared LLM scheduler."""
+    jobs = [(pos, item) for pos, item in enumerate(items) if item.tokens > max_length and item.attempts < max_attempts]
+    if not jobs:
+        return items, False
+
+    split_results = run_tasks([
+        split_sentence_async(item.text, math.ceil(item.tokens / max_length), max_length, index=pos, bypass_cache=item.attempts > 0)
+        for pos, item in jobs
+    ])
+    replaced = {pos: _split_item(item, result, nlp) for (pos, item), result in zip(jobs, split_results)}
+    return [new for pos, item in enumerate(items) for new in replaced.get(pos, [item])], True
 
 @check_file_exists(_3_2_SPLIT_BY_MEANING)
 def split_sentences_by_meaning():
@@ -115,13 +181,18 @@ def split_sentences_by_meaning():
         sentences = [line.strip() for line in f.readlines()]
 
     nlp = init_nlp()
-    # 🔄 process sentences multiple times to ensure all are split
-    for retry_attempt in range(3):
-        sentences = parallel_split_sentences(sentences, max_length=load_key("max_split_length"), max_workers=load_key("max_workers"), nlp=nlp, retry_attempt=retry_attempt)
+    max_length = load_key("max_split_length")
+    # tokenizer-only batch over all sentences, once; later rounds only count the fragments they produce
+    items = [SplitItem(sentence, n) for sentence, n in zip(sentences, token_counts(sentences, nlp))]
+    # 🔄 re-send only what is still too long, at most 3 rounds
+    for _ in range(3):
+        items, pending = parallel_split_sentences(items, max_length, nlp)
+        if not pending:
+            break
 
     # 💾 save results
     with open(_3_2_SPLIT_BY_MEANING, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sentences))
+        f.write('\n'.join(item.text for item in items))
     console.print('[green]✅ All sentences have been successfully split![/green]')
 
 if __name__ == '__main__':
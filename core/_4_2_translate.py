@@ -1,7 +1,6 @@
 import pandas as pd
 import json
-import concurrent.futures
-from core.translate_lines import translate_lines
+from core.translate_lines import translate_lines_async
 from core._4_1_summarize import search_things_to_note_in_prompt
 from core._8_1_audio_task import check_len_then_trim
 from core._6_gen_sub import align_timestamp
@@ -10,6 +9,7 @@ from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from difflib import SequenceMatcher
 from core.utils.models import *
+from core.utils.llm_engine import run_tasks
 console = Console()
 
 # Function to split text into chunks
@@ -39,11 +39,11 @@ def get_after_content(chunks, chunk_index):
     return None if chunk_index == len(chunks) - 1 else chunks[chunk_index + 1].split('\n')[:2] # Get first 2 lines
 
 # 🔍 Translate a single chunk
-def translate_chunk(chunk, chunks, theme_prompt, i):
+async def translate_chunk(chunk, chunks, theme_prompt, i):
     things_to_note_prompt = search_things_to_note_in_prompt(chunk)
     previous_content_prompt = get_previous_content(chunks, i)
     after_content_prompt = get_after_content(chunks, i)
-    translation, english_result = translate_lines(chunk, previous_content_prompt, after_content_prompt, things_to_note_prompt, theme_prompt, i)
+    translation, english_result = await translate_lines_async(chunk, previous_content_prompt, after_content_prompt, things_to_note_prompt, theme_prompt, i)
     return i, english_result, translation
 
 # Add similarity calculation function
@@ -58,18 +58,11 @@ def translate_all():
     with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
         theme_prompt = json.load(file).get('theme')
 
-    # 🔄 Use concurrent execution for translation
+    # 🔄 Submit every chunk to the shared LLM scheduler
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
         task = progress.add_task("[cyan]Translating chunks...", total=len(chunks))
-        with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
-            futures = []
-            for i, chunk in enumerate(chunks):
-                future = executor.submit(translate_chunk, chunk, chunks, theme_prompt, i)
-                futures.append(future)
-            results = []
-            for future in concurrent.futures.as_completed(futures):
-                results.append(future.result())
-                progress.update(task, advance=1)
+        results = run_tasks([translate_chunk(chunk, chunks, theme_prompt, i) for i, chunk in enumerate(chunks)],
+                            on_done=lambda: progress.update(task, advance=1))
 
     results.sort(key=lambda x: x[0])  # Sort results based on original order
     
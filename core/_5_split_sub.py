@@ -1,14 +1,14 @@
 import pandas as pd
 from typing import List, Tuple
-import concurrent.futures
 
-from core._3_2_split_meaning import split_sentence
+from core._3_2_split_meaning import split_sentence_async
 from core.prompts import get_align_prompt
 from rich.panel import Panel
 from rich.console import Console
 from rich.table import Table
 from core.utils import *
 from core.utils.models import *
+from core.utils.llm_engine import ask_gpt_async, run_tasks
 console = Console()
 
 # ! You can modify your own weights here
@@ -30,7 +30,7 @@ def calc_len(text: str) -> float:
 
     return sum(char_weight(char) for char in text)
 
-def align_subs(src_sub: str, tr_sub: str, src_part: str) -> Tuple[List[str], List[str], str]:
+async def align_subs(src_sub: str, tr_sub: str, src_part: str) -> Tuple[List[str], List[str], str]:
     align_prompt = get_align_prompt(src_sub, tr_sub, src_part)
     
     def valid_align(response_data):
@@ -39,7 +39,7 @@ def align_subs(src_sub: str, tr_sub: str, src_part: str) -> Tuple[List[str], Lis
         if len(response_data['align']) < 2:
             return {"status": "error", "message": "Align does not contain more than 1 part as expected!"}
         return {"status": "success", "message": "Align completed"}
-    parsed = ask_gpt(align_prompt, resp_type='json', valid_def=valid_align, log_title='align_subs')
+    parsed = await ask_gpt_async(align_prompt, resp_type='json', valid_def=valid_align, log_title='align_subs')
     align_data = parsed['align']
     src_parts = src_part.split('\n')
     tr_parts = [item[f'target_part_{i+1}'].strip() for i, item in enumerate(align_data)]
@@ -76,16 +76,19 @@ def split_align_subs(src_lines: List[str], tr_lines: List[str]):
             table.add_row("Target Line", tr)
             console.print(table)
     
-    @except_handler("Error in split_align_subs")
-    def process(i):
-        split_src = split_sentence(src_lines[i], num_parts=2).strip()
-        src_parts, tr_parts, tr_remerged = align_subs(src_lines[i], tr_lines[i], split_src)
+    async def process(i):
+        try:
+            split_src = (await split_sentence_async(src_lines[i], num_parts=2)).strip()
+            src_parts, tr_parts, tr_remerged = await align_subs(src_lines[i], tr_lines[i], split_src)
+        except Exception as e:
+            # a failed line stays unsplit and is retried by the next split attempt
+            rprint(f"[red]Error in split_align_subs: {e}[/red]")
+            return
         src_lines[i] = src_parts
         tr_lines[i] = tr_parts
         remerged_tr_lines[i] = tr_remerged
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
-        executor.map(process, to_split)
+    run_tasks([process(i) for i in to_split])
     
     # Flatten `src_lines` and `tr_lines`
     src_lines = [item for sublist in src_lines for item in (sublist if isinstance(sublist, list) else [sublist])]
@@ -1,9 +1,10 @@
-import os, subprocess, time
+import os, subprocess
 from core._1_ytdlp import find_video_files
 import cv2
 import numpy as np
 import platform
 from core.utils import *
+from core.utils.video_render import RenderTarget, render
 
 SRC_FONT_SIZE = 15
 TRANS_FONT_SIZE = 17
@@ -62,45 +63,18 @@ def merge_subtitles_to_video():
         rprint("Subtitle files not found in the 'output' directory.")
         exit(1)
 
-    video = cv2.VideoCapture(video_file)
-    TARGET_WIDTH = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
-    TARGET_HEIGHT = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    video.release()
-    rprint(f"[bold green]Video resolution: {TARGET_WIDTH}x{TARGET_HEIGHT}[/bold green]")
-    ffmpeg_cmd = [
-        'ffmpeg', '-i', video_file,
-        '-vf', (
-            f"scale={TARGET_WIDTH}:{TARGET_HEIGHT}:force_original_aspect_ratio=decrease,"
-            f"pad={TARGET_WIDTH}:{TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
-            f"subtitles={SRC_SRT}:force_style='FontSize={SRC_FONT_SIZE},FontName={FONT_NAME}," 
-            f"PrimaryColour={SRC_FONT_COLOR},OutlineColour={SRC_OUTLINE_COLOR},OutlineWidth={SRC_OUTLINE_WIDTH},"
-            f"ShadowColour={SRC_SHADOW_COLOR},BorderStyle=1',"
-            f"subtitles={TRANS_SRT}:force_style='FontSize={TRANS_FONT_SIZE},FontName={TRANS_FONT_NAME},"
-            f"PrimaryColour={TRANS_FONT_COLOR},OutlineColour={TRANS_OUTLINE_COLOR},OutlineWidth={TRANS_OUTLINE_WIDTH},"
-            f"BackColour={TRANS_BACK_COLOR},Alignment=2,MarginV=27,BorderStyle=4'"
-        ).encode('utf-8'),
-    ]
+    render(video_file, [sub_video_target()], gpu=load_key("ffmpeg_gpu"))
 
-    ffmpeg_gpu = load_key("ffmpeg_gpu")
-    if ffmpeg_gpu:
-        rprint("[bold green]will use GPU acceleration.[/bold green]")
-        ffmpeg_cmd.extend(['-c:v', 'h264_nvenc'])
-    ffmpeg_cmd.extend(['-y', OUTPUT_VIDEO])
-
-    rprint("🎬 Start merging subtitles to video...")
-    start_time = time.time()
-    process = subprocess.Popen(ffmpeg_cmd)
-
-    try:
-        process.wait()
-        if process.returncode == 0:
-            rprint(f"\n✅ Done! Time taken: {time.time() - start_time:.2f} seconds")
-        else:
-            rprint("\n❌ FFmpeg execution error")
-    except Exception as e:
-        rprint(f"\n❌ Error occurred: {e}")
-        if process.poll() is None:
-            process.kill()
+def sub_video_target():
+    """output_sub.mp4: source and translated subtitles burned in, source audio kept"""
+    return RenderTarget(OUTPUT_VIDEO, video_filter=(
+        f"subtitles={SRC_SRT}:force_style='FontSize={SRC_FONT_SIZE},FontName={FONT_NAME}," 
+        f"PrimaryColour={SRC_FONT_COLOR},OutlineColour={SRC_OUTLINE_COLOR},OutlineWidth={SRC_OUTLINE_WIDTH},"
+        f"ShadowColour={SRC_SHADOW_COLOR},BorderStyle=1',"
+        f"subtitles={TRANS_SRT}:force_style='FontSize={TRANS_FONT_SIZE},FontName={TRANS_FONT_NAME},"
+        f"PrimaryColour={TRANS_FONT_COLOR},OutlineColour={TRANS_OUTLINE_COLOR},OutlineWidth={TRANS_OUTLINE_WIDTH},"
+        f"BackColour={TRANS_BACK_COLOR},Alignment=2,MarginV=27,BorderStyle=4'"
+    ))
 
 if __name__ == "__main__":
     merge_subtitles_to_video()
\ No newline at end of file
@@ -2,7 +2,7 @@ import datetime
 import re
 import pandas as pd
 from core._8_1_audio_task import time_diff_seconds
-from core.asr_backend.audio_preprocess import get_audio_duration
+from core.asr_backend.energy_profile import get_profile
 from core.tts_backend.estimate_duration import init_estimator, estimate_duration
 from core.utils import *
 from core.utils.models import *
@@ -61,7 +61,9 @@ def analyze_subtitle_timing_and_speed(df):
     if ESTIMATOR is None:
         ESTIMATOR = init_estimator()
     TOLERANCE = load_key("tolerance")
-    whole_dur = get_audio_duration(_RAW_AUDIO_FILE)
+    # built (and cached next to raw.mp3) during ASR, so this is a lookup rather than a decode
+    raw_profile = get_profile(_RAW_AUDIO_FILE)
+    whole_dur = raw_profile.duration
     df['gap'] = 0.0  # Initialize gap column
     for i in range(len(df) - 1):
         current_end = datetime.datetime.strptime(df.loc[i, 'end_time'], '%H:%M:%S.%f').time()
@@ -72,7 +74,8 @@ def analyze_subtitle_timing_and_speed(df):
     last_end = datetime.datetime.strptime(df.iloc[-1]['end_time'], '%H:%M:%S.%f').time()
     last_end_seconds = (last_end.hour * 3600 + last_end.minute * 60 + 
                        last_end.second + last_end.microsecond / 1000000)
-    df.iloc[-1, df.columns.get_loc('gap')] = whole_dur - last_end_seconds
+    # frame rounding may leave the profile a few ms short of the last subtitle end
+    df.iloc[-1, df.columns.get_loc('gap')] = max(whole_dur - last_end_seconds, 0.0)
     
     df['tolerance'] = df['gap'].apply(lambda x: TOLERANCE if x > TOLERANCE else x)
     df['tol_dur'] = df['duration'] + df['tolerance']
@@ -7,7 +7,7 @@ from core.utils.models import *
 import pandas as pd
 import soundfile as sf
 console = Console()
-from core.asr_backend.demucs_vl import demucs_audio
+from core.asr_backend.demucs_vl import get_stem
 from core.utils.models import *
 
 def time_to_samples(time_str, sr):
@@ -24,7 +24,6 @@ def extract_audio(audio_data, sr, start_time, end_time, out_file):
     sf.write(out_file, audio_data[start:end], sr)
 
 def extract_refer_audio_main():
-    demucs_audio() #!!! in case demucs not run
     if os.path.exists(os.path.join(_AUDIO_SEGS_DIR, '1.wav')):
         rprint(Panel("Audio segments already exist, skipping extraction", title="Info", border_style="blue"))
         return
@@ -34,7 +33,8 @@ def extract_refer_audio_main():
     
     # Read task file and audio data
     df = pd.read_excel(_8_1_AUDIO_TASK)
-    data, sr = sf.read(_VOCAL_AUDIO_FILE)
+    # separated once per input; reused from cache when ASR already ran Demucs
+    data, sr = sf.read(get_stem("vocals"))
     
     with Progress(
         SpinnerColumn(),
@@ -1,27 +1,38 @@
-# use try-except to avoid error when installing
-try:
-    from . import (
-        _1_ytdlp,
-        _2_asr,
-        _3_1_split_nlp,
-        _3_2_split_meaning,
-        _4_1_summarize,
-        _4_2_translate,
-        _5_split_sub,
-        _6_gen_sub,
-        _7_sub_into_vid,
-        _8_1_audio_task,
-        _8_2_dub_chunks,
-        _9_refer_audio,
-        _10_gen_audio,
-        _11_merge_audio,
-        _12_dub_to_vid
-    )
-    from .utils import *
-    from .utils.onekeycleanup import cleanup
-    from .utils.delete_retry_dubbing import delete_dubbing_files
-except ImportError:
-    pass
+import importlib
+
+# steps are imported on first access (PEP 562): `from core import *` still loads all of them, but a process
+# that only needs one light module (e.g. a spawned process pool worker) no longer pulls in every backend
+_STEPS = (
+    '_1_ytdlp',
+    '_2_asr',
+    '_3_1_split_nlp',
+    '_3_2_split_meaning',
+    '_4_1_summarize',
+    '_4_2_translate',
+    '_5_split_sub',
+    '_6_gen_sub',
+    '_7_sub_into_vid',
+    '_8_1_audio_task',
+    '_8_2_dub_chunks',
+    '_9_refer_audio',
+    '_10_gen_audio',
+    '_11_merge_audio',
+    '_12_dub_to_vid'
+)
+_UTILS = {
+    'ask_gpt': '.utils',
+    'load_key': '.utils',
+    'update_key': '.utils',
+    'cleanup': '.utils.onekeycleanup',
+    'delete_dubbing_files': '.utils.delete_retry_dubbing',
+}
+
+def __getattr__(name):
+    if name in _STEPS:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _UTILS:
+        return getattr(importlib.import_module(_UTILS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'ask_gpt',
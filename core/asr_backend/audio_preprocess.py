@@ -1,20 +1,23 @@
-import os, subprocess
+import os, subprocess, json
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
-from pydub import AudioSegment
 from core.utils import *
 from core.utils.models import *
-from pydub import AudioSegment
-from pydub.silence import detect_silence
-from pydub.utils import mediainfo
+from core.asr_backend.energy_profile import get_profile
 from rich import print as rprint
 
 def normalize_audio_volume(audio_path, output_path, target_db = -20.0, format = "wav"):
-    audio = AudioSegment.from_file(audio_path)
-    change_in_dBFS = target_db - audio.dBFS
-    normalized_audio = audio.apply_gain(change_in_dBFS)
-    normalized_audio.export(output_path, format=format)
-    rprint(f"[green]✅ Audio normalized from {audio.dBFS:.1f}dB to {target_db:.1f}dB[/green]")
+    # loudness of the file as it is, from its cached energy profile; ffmpeg applies the gain in one pass
+    dbfs = get_profile(audio_path).dbfs
+    # silent input has no level to normalize from: keep it silent instead of applying infinite gain
+    change_in_dBFS = target_db - dbfs if np.isfinite(dbfs) else 0.0
+    codec = ['-c:a', 'libmp3lame', '-b:a', '128k'] if format == "mp3" else ['-c:a', 'pcm_s16le']
+    tmp_path = f"{os.path.splitext(output_path)[0]}.normalizing.{format}"
+    subprocess.run(['ffmpeg', '-y', '-i', audio_path, '-af', f'volume={change_in_dBFS:.4f}dB', *codec, tmp_path],
+                   check=True, stderr=subprocess.PIPE)
+    os.replace(tmp_path, output_path)
+    rprint(f"[green]✅ Audio normalized from {dbfs:.1f}dB to {target_db:.1f}dB[/green]")
     return output_path
 
 def convert_video_to_audio(video_file: str):
@@ -30,27 +33,12 @@ def convert_video_to_audio(video_file: str):
         ], check=True, stderr=subprocess.PIPE)
         rprint(f"[green]🎬➡️🎵 Converted <{video_file}> to <{_RAW_AUDIO_FILE}> with FFmpeg\n[/green]")
 
-def get_audio_duration(audio_file: str) -> float:
-    """Get the duration of an audio file using ffmpeg."""
-    cmd = ['ffmpeg', '-i', audio_file]
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    _, stderr = process.communicate()
-    output = stderr.decode('utf-8', errors='ignore')
-    
-    try:
-        duration_str = [line for line in output.split('\n') if 'Duration' in line][0]
-        duration_parts = duration_str.split('Duration: ')[1].split(',')[0].split(':')
-        duration = float(duration_parts[0])*3600 + float(duration_parts[1])*60 + float(duration_parts[2])
-    except Exception as e:
-        print(f"[red]❌ Error: Failed to get audio duration: {e}[/red]")
-        duration = 0
-    return duration
-
 def split_audio(audio_file: str, target_len: float = 30*60, win: float = 60) -> List[Tuple[float, float]]:
-    ## 在 [target_len-win, target_len+win] 区间内用 pydub 检测静默，切分音频
+    ## 在 [target_len-win, target_len+win] 区间内检测静默，切分音频；静默查询来自缓存的能量包络
     rprint(f"[blue]🎙️ Starting audio segmentation {audio_file} {target_len} {win}[/blue]")
-    audio = AudioSegment.from_file(audio_file)
-    duration = float(mediainfo(audio_file)["duration"])
+    # built for every file: the dubbing stage reads its duration and gaps from the same cached profile
+    profile = get_profile(audio_file)
+    duration = profile.duration
     if duration <= target_len + win:
         return [(0, duration)]
     segments, pos = [], 0.0
@@ -61,11 +49,9 @@ def split_audio(audio_file: str, target_len: float = 30*60, win: float = 60) ->
             segments.append((pos, duration)); break
 
         threshold = pos + target_len
-        ws, we = int((threshold - win) * 1000), int((threshold + win) * 1000)
         
         # 获取完整的静默区域
-        silence_regions = detect_silence(audio[ws:we], min_silence_len=int(safe_margin*1000), silence_thresh=-30)
-        silence_regions = [(s/1000 + (threshold - win), e/1000 + (threshold - win)) for s, e in silence_regions]
+        silence_regions = profile.silence_regions(silence_thresh=-30, min_silence_len=safe_margin, start=threshold - win, end=threshold + win)
         # 筛选长度足够（至少1秒）且位置适合的静默区域
         valid_regions = [
             (start, end) for start, end in silence_regions 
@@ -0,0 +1,73 @@
+import os
+import hashlib
+import subprocess
+import threading
+import numpy as np
+from rich import print as rprint
+from core.utils.models import _AUDIO_DIR
+
+# ------------
+# decode once, share PCM across segments
+# ------------
+
+SAMPLE_RATE = 16000
+PCM_CACHE_DIR = os.path.join(_AUDIO_DIR, "pcm")
+
+_sources = {}
+_lock = threading.Lock()
+
+def _pcm_path(audio_file, sr):
+    name = os.path.splitext(os.path.basename(audio_file))[0]
+    # files with the same name in different folders (e.g. refers/1.wav, segs/1.wav) must not collide
+    digest = hashlib.md5(os.path.abspath(audio_file).encode('utf-8')).hexdigest()[:8]
+    return os.path.join(PCM_CACHE_DIR, f"{name}.{digest}.{sr}.f32")
+
+def _decode_to_pcm(audio_file, pcm_file, sr):
+    """Let ffmpeg write mono float32 samples straight to disk, nothing is held in Python memory"""
+    rprint(f"[blue]🎧 Decoding {audio_file} to {sr}Hz PCM cache ...[/blue]")
+    os.makedirs(PCM_CACHE_DIR, exist_ok=True)
+    tmp_file = pcm_file + ".part"
+    subprocess.run([
+        'ffmpeg', '-y', '-i', audio_file, '-vn',
+        '-ac', '1', '-ar', str(sr),
+        '-f', 'f32le', tmp_file
+    ], check=True, stderr=subprocess.PIPE)
+    os.replace(tmp_file, pcm_file)
+
+def load_pcm(audio_file, sr=SAMPLE_RATE):
+    """Return the whole file as a memory-mapped float32 array, decoding at most once per file version"""
+    stat = os.stat(audio_file)
+    key = (os.path.abspath(audio_file), sr)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _sources.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        # drop a mapping of an older file version before its pcm file is replaced (Windows refuses otherwise)
+        _sources.pop(key, None)
+        cached = None
+        pcm_file = _pcm_path(audio_file, sr)
+        # the on-disk cache is valid as long as it is newer than the audio it was decoded from
+        if not os.path.exists(pcm_file) or os.stat(pcm_file).st_mtime_ns < stat.st_mtime_ns:
+            _decode_to_pcm(audio_file, pcm_file, sr)
+        if os.path.getsize(pcm_file) == 0:
+            samples = np.zeros(0, dtype=np.float32)
+        else:
+            # copy-on-write mapping: slices are zero-copy views but stay writable for torch
+            samples = np.memmap(pcm_file, dtype=np.float32, mode='c')
+        _sources[key] = (stamp, samples)
+        return samples
+
+def get_duration(audio_file, sr=SAMPLE_RATE):
+    return len(load_pcm(audio_file, sr)) / sr
+
+def get_segment(audio_file, start=None, end=None, sr=SAMPLE_RATE):
+    """Zero-copy view of [start, end) seconds; None means from the beginning / to the end"""
+    samples = load_pcm(audio_file, sr)
+    start_sample = 0 if start is None else int(start * sr)
+    end_sample = len(samples) if end is None else int(end * sr)
+    return samples[start_sample:end_sample]
+
+def release_sources():
+    with _lock:
+        _sources.clear()
@@ -1,54 +1,278 @@
 import os
+import json
+import hashlib
+import math
+import shutil
+import subprocess
 import torch
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from rich.console import Console
 from rich import print as rprint
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
 from demucs.pretrained import get_model
-from demucs.audio import save_audio
 from torch.cuda import is_available as is_cuda_available
 from typing import Optional
 from demucs.api import Separator
 from demucs.apply import BagOfModels
 import gc
+from core.utils.config_utils import load_key
 from core.utils.models import *
+from core.utils.gpu_memory import release_gpu_memory
+from core.asr_backend.media_info import probe_audio
+
+MODEL_NAME = 'htdemucs'
+# separations live next to the models, outside output/, so cleanup never throws them away
+SEPARATION_CACHE_DIR = os.path.join(load_key("model_dir"), "demucs_separations")
+STEM_FILES = {"vocals": _VOCAL_AUDIO_FILE, "background": _BACKGROUND_AUDIO_FILE}
+# finished chunks wait on disk as 16-bit pcm: half the size of float32, and the encoders clamp to [-1, 1] anyway
+CHUNK_FORMAT = "int16"
+CHUNK_SCALE = 32767
 
 class PreloadedSeparator(Separator):
     def __init__(self, model: BagOfModels, shifts: int = 1, overlap: float = 0.25,
-                 split: bool = True, segment: Optional[int] = None, jobs: int = 0):
+                 split: bool = True, segment: Optional[int] = None, jobs: int = 0, progress: bool = True):
         self._model, self._audio_channels, self._samplerate = model, model.audio_channels, model.samplerate
         device = "cuda" if is_cuda_available() else "mps" if torch.backends.mps.is_available() else "cpu"
         self.update_parameter(device=device, shifts=shifts, overlap=overlap, split=split,
-                            segment=segment, jobs=jobs, progress=True, callback=None, callback_arg=None)
+                            segment=segment, jobs=jobs, progress=progress, callback=None, callback_arg=None)
 
-def demucs_audio():
-    if os.path.exists(_VOCAL_AUDIO_FILE) and os.path.exists(_BACKGROUND_AUDIO_FILE):
-        rprint(f"[yellow]⚠️ {_VOCAL_AUDIO_FILE} and {_BACKGROUND_AUDIO_FILE} already exist, skip Demucs processing.[/yellow]")
-        return
-    
+# ------------
+# one window of the input, separated into (vocals, background)
+# ------------
+
+def read_window(audio_file, start, length, sr, channels):
+    """Decode `length` samples from sample `start` as a (channels, n) float32 array, resampled by ffmpeg"""
+    cmd = ['ffmpeg', '-v', 'error', '-ss', f"{start / sr:.6f}", '-i', audio_file,
+           '-t', f"{length / sr:.6f}", '-vn', '-ac', str(channels), '-ar', str(sr), '-f', 'f32le', '-']
+    raw = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, channels).T
+
+def separate_window(separator, audio_file, start, length):
+    wav = read_window(audio_file, start, length, separator.samplerate, separator.audio_channels)
+    if wav.shape[-1] == 0:
+        return np.zeros((2, separator.audio_channels, 0), dtype=np.float32)
+    _, stems = separator.separate_tensor(torch.from_numpy(wav.copy()), separator.samplerate)
+    vocals = stems['vocals'].cpu().numpy()
+    background = sum(audio for source, audio in stems.items() if source != 'vocals').cpu().numpy()
+    return np.stack([vocals, background]).astype(np.float32)
+
+def _chunk_path(chunk_dir, index):
+    return os.path.join(chunk_dir, f"{index:04d}.npy")
+
+def _save_chunk(chunk_dir, index, stems):
+    tmp_file = _chunk_path(chunk_dir, index) + ".part"
+    with open(tmp_file, 'wb') as f:
+        np.save(f, np.round(np.clip(stems, -1, 1) * CHUNK_SCALE).astype(np.int16))
+    # a chunk only counts as done once it is complete on disk
+    os.replace(tmp_file, _chunk_path(chunk_dir, index))
+
+def _load_chunk(chunk_dir, index):
+    return np.load(_chunk_path(chunk_dir, index)).astype(np.float32) / CHUNK_SCALE
+
+_worker_separator = None
+
+def _init_worker(threads):
+    global _worker_separator
+    torch.set_num_threads(threads)
+    _worker_separator = PreloadedSeparator(model=get_model(MODEL_NAME), shifts=1, overlap=0.25, progress=False)
+
+def _separate_chunk(audio_file, chunk_dir, index, start, length):
+    _save_chunk(chunk_dir, index, separate_window(_worker_separator, audio_file, start, length))
+    return index
+
+# ------------
+# chunk plan & resume
+# ------------
+
+def plan_chunks(total, sr, seconds, overlap):
+    """[(start, length)] windows of `seconds` each, extended by `overlap` on both sides"""
+    step, pad = int(seconds * sr), int(overlap * sr)
+    chunks = []
+    for i in range(max(1, math.ceil(total / step))):
+        start = max(0, i * step - pad)
+        end = min(total, (i + 1) * step + pad)
+        chunks.append((start, end - start))
+    return chunks
+
+def _prepare_chunk_dir(chunk_dir, plan):
+    """Keep finished chunks only if they were made with the same plan"""
+    plan_file = os.path.join(chunk_dir, "plan.json")
+    try:
+        with open(plan_file, 'r', encoding='utf-8') as f:
+            if json.load(f) == plan:
+                return
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    os.makedirs(chunk_dir, exist_ok=True)
+    with open(plan_file, 'w', encoding='utf-8') as f:
+        json.dump(plan, f)
+
+# ------------
+# streaming writer: cross-fade neighbouring chunks and pipe straight into the encoders
+# ------------
+
+def _open_encoder(output_file, sr, channels):
+    return subprocess.Popen([
+        'ffmpeg', '-y', '-v', 'error', '-f', 'f32le', '-ar', str(sr), '-ac', str(channels), '-i', '-',
+        '-c:a', 'libmp3lame', '-b:a', '128k', output_file
+    ], stdin=subprocess.PIPE)
+
+class StemWriter:
+    def __init__(self, outputs, sr, channels):
+        self.encoders = [_open_encoder(f, sr, channels) for f in outputs]
+        self.written = 0
+        self.pending = None
+
+    def _emit(self, stems):
+        for encoder, audio in zip(self.encoders, stems):
+            # streamed output cannot be rescaled afterwards, so clamp like demucs' "clamp" mode
+            encoder.stdin.write(np.clip(audio, -1, 1).T.astype('<f4').tobytes())
+
+    def add(self, start, stems):
+        if self.pending is not None:
+            prev_start, prev = self.pending
+            prev_end = prev_start + prev.shape[-1]
+            n = max(0, min(prev_end - start, stems.shape[-1]))
+            self._emit(prev[..., self.written - prev_start:start - prev_start])
+            if n:
+                fade = np.linspace(0, 1, n, dtype=np.float32)
+                self._emit(prev[..., start - prev_start:] * (1 - fade) + stems[..., :n] * fade)
+            self.written = max(self.written, start + n)
+        self.pending = (start, stems)
+
+    def close(self):
+        if self.pending is not None:
+            start, stems = self.pending
+            self._emit(stems[..., self.written - start:])
+        for encoder in self.encoders:
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError("ffmpeg failed to encode separated audio")
+
+def _worker_count(n_chunks):
+    workers = load_key("demucs_chunk.workers") or max(1, (os.cpu_count() or 1) // 4)
+    return max(1, min(workers, n_chunks))
+
+# ------------
+# separation cache: one entry per (raw audio content, model)
+# ------------
+
+def _content_hash(audio_file):
+    digest = hashlib.sha256()
+    with open(audio_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def _separate(audio_file, entry_dir):
+    """Separate `audio_file` into vocals.mp3 / background.mp3 inside `entry_dir`, resuming from finished chunks"""
     console = Console()
-    os.makedirs(_AUDIO_DIR, exist_ok=True)
-    
-    console.print("🤖 Loading <htdemucs> model...")
-    model = get_model('htdemucs')
-    separator = PreloadedSeparator(model=model, shifts=1, overlap=0.25)
-    
-    console.print("🎵 Separating audio...")
-    _, outputs = separator.separate_audio_file(_RAW_AUDIO_FILE)
-    
-    kwargs = {"samplerate": model.samplerate, "bitrate": 128, "preset": 2, 
-             "clip": "rescale", "as_float": False, "bits_per_sample": 16}
-    
-    console.print("🎤 Saving vocals track...")
-    save_audio(outputs['vocals'].cpu(), _VOCAL_AUDIO_FILE, **kwargs)
-    
-    console.print("🎹 Saving background music...")
-    background = sum(audio for source, audio in outputs.items() if source != 'vocals')
-    save_audio(background.cpu(), _BACKGROUND_AUDIO_FILE, **kwargs)
-    
+    release_gpu_memory("before Demucs")
+
+    console.print(f"🤖 Loading <{MODEL_NAME}> model...")
+    model = get_model(MODEL_NAME)
+    sr, channels = model.samplerate, model.audio_channels
+    seconds, overlap = load_key("demucs_chunk.seconds"), load_key("demucs_chunk.overlap")
+    total = int(probe_audio(audio_file)["duration"] * sr)
+    chunks = plan_chunks(total, sr, seconds, overlap)
+    chunk_dir = os.path.join(entry_dir, "chunks")
+    _prepare_chunk_dir(chunk_dir, {"seconds": seconds, "overlap": overlap, "format": CHUNK_FORMAT})
+    todo = [i for i in range(len(chunks)) if not os.path.exists(_chunk_path(chunk_dir, i))]
+    if len(todo) < len(chunks):
+        console.print(f"[cyan]♻️ Resuming: {len(chunks) - len(todo)}/{len(chunks)} chunks already separated[/cyan]")
+
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(),
+                  TextColumn("{task.completed}/{task.total}"), TimeRemainingColumn()) as progress:
+        task = progress.add_task("🎵 Separating audio...", total=len(chunks), completed=len(chunks) - len(todo))
+        if is_cuda_available() or torch.backends.mps.is_available() or _worker_count(len(todo)) == 1:
+            # one accelerator (or one core budget): separate in-process with the model already loaded
+            separator = PreloadedSeparator(model=model, shifts=1, overlap=0.25, progress=False)
+            for i in todo:
+                _save_chunk(chunk_dir, i, separate_window(separator, audio_file, *chunks[i]))
+                progress.advance(task)
+            del separator
+        elif todo:
+            workers = _worker_count(len(todo))
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as executor:
+                futures = [executor.submit(_separate_chunk, audio_file, chunk_dir, i, *chunks[i]) for i in todo]
+                for future in futures:
+                    future.result()
+                    progress.advance(task)
+
+    console.print("🎤 Writing vocals and background music...")
+    outputs = [os.path.join(entry_dir, f"{stem}.mp3") for stem in STEM_FILES]
+    tmp_outputs = [f + ".part.mp3" for f in outputs]
+    writer = StemWriter(tmp_outputs, sr, channels)
+    for i, (start, _) in enumerate(chunks):
+        writer.add(start, _load_chunk(chunk_dir, i))
+    writer.close()
+    for tmp_file, output in zip(tmp_outputs, outputs):
+        os.replace(tmp_file, output)
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+
     # Clean up memory
-    del outputs, background, model, separator
+    del model, writer
     gc.collect()
-    
+
     console.print("[green]✨ Audio separation completed![/green]")
 
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def evict_separations(max_bytes, keep=None):
+    """Drop least recently used cache entries (unfinished ones included) until the cache fits in `max_bytes`"""
+    entries = []
+    for model in os.listdir(SEPARATION_CACHE_DIR) if os.path.isdir(SEPARATION_CACHE_DIR) else []:
+        model_dir = os.path.join(SEPARATION_CACHE_DIR, model)
+        if os.path.isdir(model_dir):
+            entries += [os.path.join(model_dir, name) for name in os.listdir(model_dir)]
+    sized = sorted((os.path.getmtime(e), e, _dir_size(e)) for e in entries if os.path.isdir(e))
+    total = sum(size for _, _, size in sized)
+    for _, entry_dir, size in sized:
+        if total <= max_bytes:
+            break
+        if entry_dir == keep:
+            continue
+        rprint(f"[yellow]🧹 Evicting cached Demucs separation:[/yellow] {entry_dir}")
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+
+def separate_stems(audio_file=_RAW_AUDIO_FILE):
+    """Return {stem: path} of the cached separation of `audio_file`, running Demucs only on a cache miss"""
+    entry_dir = os.path.join(SEPARATION_CACHE_DIR, MODEL_NAME, _content_hash(audio_file))
+    stems = {stem: os.path.join(entry_dir, f"{stem}.mp3") for stem in STEM_FILES}
+    if all(os.path.exists(path) for path in stems.values()):
+        rprint(f"[green]♻️ Reusing cached Demucs separation:[/green] {entry_dir}")
+        # the entry's mtime is its last use for eviction
+        os.utime(entry_dir)
+    else:
+        os.makedirs(entry_dir, exist_ok=True)
+        _separate(audio_file, entry_dir)
+    evict_separations(load_key("demucs_cache_max_gb") * 1024 ** 3, keep=entry_dir)
+    return stems
+
+def get_stem(stem):
+    """Single entry point for separated audio: make sure `output/audio/<stem>.mp3` exists and return its path.
+
+    The output copy may be post-processed in place (ASR normalizes the vocals), the cached original never is.
+    """
+    output_file = STEM_FILES[stem]
+    if os.path.exists(output_file):
+        return output_file
+    cached = separate_stems()[stem]
+    os.makedirs(_AUDIO_DIR, exist_ok=True)
+    shutil.copyfile(cached, output_file)
+    return output_file
+
+def demucs_audio():
+    if os.path.exists(_VOCAL_AUDIO_FILE) and os.path.exists(_BACKGROUND_AUDIO_FILE):
+        rprint(f"[yellow]⚠️ {_VOCAL_AUDIO_FILE} and {_BACKGROUND_AUDIO_FILE} already exist, skip Demucs processing.[/yellow]")
+        return
+    for stem in STEM_FILES:
+        get_stem(stem)
+
 if __name__ == "__main__":
     demucs_audio()
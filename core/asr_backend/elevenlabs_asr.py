@@ -3,10 +3,10 @@ import json
 import time
 import requests
 import tempfile
-import librosa
 import soundfile as sf
 from rich import print as rprint
 from core.utils import *
+from core.asr_backend.audio_source import get_segment, get_duration, SAMPLE_RATE
 
 # ----------------------------------------
 # ISO 639-2 to 1
@@ -71,18 +71,14 @@ def transcribe_audio_elevenlabs(raw_audio_path, vocal_audio_path, start = None,
         with open(LOG_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     
-    # Load audio and process start/end parameters
-    y, sr = librosa.load(vocal_audio_path, sr=16000)
-    audio_duration = len(y) / sr
-    
+    # Process start/end parameters
     if start is None or end is None:
         start = 0
-        end = audio_duration
+        end = get_duration(vocal_audio_path)
     
-    # Slice audio based on start/end
-    start_sample = int(start * sr)
-    end_sample = int(end * sr)
-    y_slice = y[start_sample:end_sample]
+    # Slice the decoded-once audio based on start/end
+    y_slice = get_segment(vocal_audio_path, start, end)
+    sr = SAMPLE_RATE
     
     # Create temporary file for the sliced audio
     with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
@@ -0,0 +1,162 @@
+import os
+import subprocess
+import threading
+import numpy as np
+from typing import Dict, List, Tuple
+from rich import print as rprint
+from core.asr_backend.media_info import probe_audio
+
+# ------------
+# frame-level energy envelope, computed once per file version and cached next to it
+# ------------
+
+FRAME_MS = 10
+BLOCK_FRAMES = 6000  # 60 s of frames per read from the decoder
+SILENCE_FLOOR_DB = -120.0
+
+_profiles = {}
+_lock = threading.Lock()
+
+class EnergyProfile:
+    """dBFS of every FRAME_MS frame plus whole-file loudness; all queries are array lookups."""
+
+    def __init__(self, frame_db: np.ndarray, dbfs: float, peak_db: float, duration: float, frame_ms: int = FRAME_MS):
+        self.frame_db = frame_db
+        self.dbfs = dbfs
+        self.peak_db = peak_db
+        self.duration = duration
+        self.frame_ms = frame_ms
+
+    def _frame(self, seconds: float) -> int:
+        return max(int(seconds * 1000 / self.frame_ms), 0)
+
+    def silence_regions(self, silence_thresh: float = -30, min_silence_len: float = 0.5, start: float = 0, end: float = None) -> List[Tuple[float, float]]:
+        """Silent (start, end) spans in seconds within [start, end), the way pydub.silence.detect_silence finds them:
+        every `min_silence_len` window whose rms is at or below `silence_thresh`, overlapping windows merged."""
+        f0 = min(self._frame(start), len(self.frame_db))
+        f1 = len(self.frame_db) if end is None else min(self._frame(end), len(self.frame_db))
+        n = max(1, int(round(min_silence_len * 1000 / self.frame_ms)))
+        if f1 - f0 < n:
+            return []
+        power = np.power(10.0, self.frame_db[f0:f1].astype(np.float64) / 10)
+        csum = np.concatenate(([0.0], np.cumsum(power)))
+        window_db = 10 * np.log10(np.maximum((csum[n:] - csum[:-n]) / n, 1e-30))
+        starts = np.nonzero(window_db <= silence_thresh)[0]
+        if len(starts) == 0:
+            return []
+        # a new region begins wherever two silent windows do not overlap
+        breaks = np.nonzero(np.diff(starts) > n)[0]
+        region_starts = np.concatenate(([starts[0]], starts[breaks + 1]))
+        region_ends = np.concatenate((starts[breaks], [starts[-1]])) + n
+        step = self.frame_ms / 1000
+        return [(float((f0 + a) * step), float(min((f0 + b) * step, self.duration))) for a, b in zip(region_starts, region_ends)]
+
+    def voice_spans(self, silence_thresh: float = -30, min_silence_len: float = 0.3) -> List[Tuple[float, float]]:
+        """Voice-activity spans: everything between silences of at least `min_silence_len`."""
+        spans, pos = [], 0.0
+        for s, e in self.silence_regions(silence_thresh, min_silence_len):
+            if s > pos:
+                spans.append((pos, s))
+            pos = e
+        if pos < self.duration:
+            spans.append((pos, self.duration))
+        return spans
+
+    def is_silent(self, start: float, end: float, silence_thresh: float = -30) -> bool:
+        frames = self.frame_db[self._frame(start):self._frame(end)]
+        return len(frames) == 0 or bool(np.all(frames <= silence_thresh))
+
+    def loudness_stats(self, silence_thresh: float = -50) -> Dict:
+        active = self.frame_db[self.frame_db > silence_thresh]
+        stats = {"dbfs": self.dbfs, "peak_db": self.peak_db, "duration": self.duration,
+                 "active_ratio": len(active) / max(len(self.frame_db), 1)}
+        if len(active):
+            stats.update({f"p{q}": float(np.percentile(active, q)) for q in (10, 50, 90)})
+        return stats
+
+def profile_from_samples(samples: np.ndarray, sample_rate: int, frame_ms: int = FRAME_MS) -> EnergyProfile:
+    """Profile of an in-memory (frames, channels) buffer; the decoder path below feeds blocks of the same math"""
+    acc = _Accumulator(sample_rate, samples.shape[1], frame_ms)
+    acc.add(samples)
+    return acc.finish()
+
+class _Accumulator:
+    def __init__(self, sample_rate, channels, frame_ms=FRAME_MS):
+        self.sample_rate, self.channels, self.frame_ms = sample_rate, channels, frame_ms
+        self.frame_len = max(sample_rate * frame_ms // 1000, 1)
+        self.rest = np.zeros((0, channels), dtype=np.float64)
+        self.frame_db, self.total_sq, self.count, self.peak = [], 0.0, 0, 0.0
+
+    def _frames(self, chunk, counts):
+        """Fold whole frames (a padded tail counts only its `counts` real samples) into the envelope and totals"""
+        chunk_sq = chunk * chunk
+        self.total_sq += float(chunk_sq.sum())
+        self.count += int(counts.sum()) * self.channels
+        self.peak = max(self.peak, float(np.abs(chunk).max()))
+        mean_sq = chunk_sq.reshape(len(counts), -1).sum(axis=1) / (counts * self.channels)
+        self.frame_db.append(10 * np.log10(np.maximum(mean_sq, 10 ** (SILENCE_FLOOR_DB / 10))))
+
+    def add(self, samples):
+        samples = np.concatenate((self.rest, np.asarray(samples, dtype=np.float64)))
+        whole = len(samples) - len(samples) % self.frame_len
+        if whole:
+            self._frames(samples[:whole], np.full(whole // self.frame_len, self.frame_len))
+        self.rest = samples[whole:]
+
+    def finish(self) -> EnergyProfile:
+        if len(self.rest):
+            padded = np.pad(self.rest, ((0, self.frame_len - len(self.rest)), (0, 0)))
+            self._frames(padded, np.array([len(self.rest)]))
+        frame_db = np.concatenate(self.frame_db).astype(np.float32) if self.frame_db else np.zeros(0, dtype=np.float32)
+        dbfs = 10 * np.log10(self.total_sq / self.count) if self.total_sq > 0 else -float("inf")
+        peak_db = 20 * np.log10(self.peak) if self.peak > 0 else -float("inf")
+        frames = self.count // self.channels
+        return EnergyProfile(frame_db, float(dbfs), float(peak_db), frames / self.sample_rate, self.frame_ms)
+
+def _compute(audio_file: str) -> EnergyProfile:
+    """Stream the file through ffmpeg at its own rate and channel layout, nothing is mapped or kept decoded"""
+    rprint(f"[blue]📈 Computing energy profile of {audio_file} ...[/blue]")
+    info = probe_audio(audio_file)
+    sr, channels = info['sample_rate'], info['channels']
+    acc = _Accumulator(sr, channels)
+    cmd = ['ffmpeg', '-v', 'error', '-i', audio_file, '-vn', '-f', 'f32le', '-ar', str(sr), '-ac', str(channels), '-']
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    block_bytes = acc.frame_len * BLOCK_FRAMES * channels * 4
+    rest = b''
+    for block in iter(lambda: process.stdout.read(block_bytes), b''):
+        block = rest + block
+        usable = len(block) - len(block) % (channels * 4)
+        acc.add(np.frombuffer(block[:usable], dtype='<f4').reshape(-1, channels))
+        rest = block[usable:]
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode {audio_file}: {stderr.decode(errors='ignore').strip()}")
+    return acc.finish()
+
+def _profile_path(audio_file: str) -> str:
+    return os.path.splitext(audio_file)[0] + ".energy.npz"
+
+def get_profile(audio_file: str) -> EnergyProfile:
+    """Profile of the current version of `audio_file`, keyed by (path, mtime, size) in memory and on disk"""
+    stat = os.stat(audio_file)
+    key = os.path.abspath(audio_file)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _profiles.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        path = _profile_path(audio_file)
+        profile = None
+        try:
+            with np.load(path) as data:
+                if tuple(int(v) for v in data["stamp"]) == stamp:
+                    profile = EnergyProfile(data["frame_db"], float(data["dbfs"]), float(data["peak_db"]),
+                                            float(data["duration"]), int(data["frame_ms"]))
+        except (OSError, KeyError, ValueError):
+            pass
+        if profile is None:
+            profile = _compute(audio_file)
+            np.savez(path, stamp=np.array(stamp, dtype=np.int64), frame_db=profile.frame_db, dbfs=profile.dbfs,
+                     peak_db=profile.peak_db, duration=profile.duration, frame_ms=profile.frame_ms)
+        _profiles[key] = (stamp, profile)
+        return profile
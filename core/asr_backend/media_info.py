@@ -0,0 +1,97 @@
+import os
+import json
+import struct
+import subprocess
+import threading
+from typing import Dict, Optional
+from rich import print as rprint
+
+# ------------
+# media metadata, memoized by (path, mtime, size)
+# ------------
+
+_cache = {}
+_lock = threading.Lock()
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def _read_wav_header(audio_file: str) -> Optional[Dict]:
+    """Parse RIFF/WAVE chunks directly; None unless the file is a PCM or float wav we can size"""
+    with open(audio_file, 'rb') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            return None
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = header[:4], struct.unpack('<I', header[4:])[0]
+            if chunk_id == b'fmt ':
+                body = f.read(chunk_size + (chunk_size & 1))
+                audio_format, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', body[:16])
+                if audio_format == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    audio_format = struct.unpack('<H', body[24:26])[0]
+                # compressed codecs (ADPCM, GSM, ...) pack many frames per block: leave sizing them to ffprobe
+                if audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+                    return None
+                fmt = {'format': audio_format, 'channels': channels, 'sample_rate': sample_rate, 'block_align': block_align, 'bits': bits}
+            elif chunk_id == b'data':
+                if fmt is None or fmt['block_align'] == 0 or fmt['sample_rate'] == 0:
+                    return None
+                # streamed writers leave the size at 0 or 0xFFFFFFFF; the bytes on disk are the truth
+                remaining = os.path.getsize(audio_file) - f.tell()
+                data_size = remaining if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, remaining)
+                frames = data_size // fmt['block_align']
+                return {
+                    'duration': frames / fmt['sample_rate'],
+                    'sample_rate': fmt['sample_rate'],
+                    'channels': fmt['channels'],
+                    'frames': frames,
+                    'bits_per_sample': fmt['bits'],
+                }
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+def _ffprobe(audio_file: str) -> Dict:
+    """Duration, sample rate and channel count of the first audio stream via one ffprobe call."""
+    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', '-select_streams', 'a:0', audio_file]
+    info = json.loads(subprocess.run(cmd, capture_output=True, check=True).stdout)
+    stream = info['streams'][0]
+    return {
+        'duration': float(info['format'].get('duration') or stream['duration']),
+        'sample_rate': int(stream['sample_rate']),
+        'channels': int(stream['channels'])
+    }
+
+def probe_audio(audio_file: str) -> Dict:
+    """Audio metadata from the wav header when possible, ffprobe otherwise; each file version is read once."""
+    audio_file = os.fspath(audio_file)
+    stat = os.stat(audio_file)
+    key = os.path.abspath(audio_file)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    info = None
+    if audio_file.lower().endswith('.wav'):
+        try:
+            info = _read_wav_header(audio_file)
+        except (OSError, struct.error):
+            info = None
+    if info is None:
+        info = _ffprobe(audio_file)
+    with _lock:
+        _cache[key] = (stamp, info)
+    return info
+
+def get_audio_duration(audio_file: str) -> float:
+    """Duration in seconds, 0 if the file is missing or unreadable."""
+    try:
+        return probe_audio(audio_file)['duration']
+    except Exception as e:
+        rprint(f"[red]❌ Error: Failed to get audio duration: {e}[/red]")
+        return 0
@@ -3,11 +3,11 @@ import io
 import json
 import time
 import requests
-import librosa
 import soundfile as sf
 from rich import print as rprint
 from core.utils import *
 from core.utils.models import *
+from core.asr_backend.audio_source import get_segment, get_duration, SAMPLE_RATE
 
 OUTPUT_LOG_DIR = "output/log"
 def transcribe_audio_302(raw_audio_path: str, vocal_audio_path: str, start: float = None, end: float = None):
@@ -21,16 +21,13 @@ def transcribe_audio_302(raw_audio_path: str, vocal_audio_path: str, start: floa
     update_key("whisper.language", WHISPER_LANGUAGE)
     url = "https://api.302.ai/302/whisperx"
     
-    y, sr = librosa.load(vocal_audio_path, sr=16000)
-    audio_duration = len(y) / sr
-    
     if start is None or end is None:
         start = 0
-        end = audio_duration
-        
-    start_sample = int(start * sr)
-    end_sample = int(end * sr)
-    y_slice = y[start_sample:end_sample]
+        end = get_duration(vocal_audio_path)
+
+    # zero-copy slice of the decoded-once vocal track
+    y_slice = get_segment(vocal_audio_path, start, end)
+    sr = SAMPLE_RATE
     
     audio_buffer = io.BytesIO()
     sf.write(audio_buffer, y_slice, sr, format='WAV', subtype='PCM_16')
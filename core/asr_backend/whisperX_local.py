@@ -1,20 +1,56 @@
 import os
+import json
 import warnings
 import time
 import subprocess
 import torch
 import whisperx
-import librosa
 from rich import print as rprint
 from core.utils import *
+from core.utils.gpu_memory import register_release_hook
+from core.asr_backend.audio_source import get_segment
 
 warnings.filterwarnings("ignore")
 MODEL_DIR = load_key("model_dir")
 
-@except_handler("failed to check hf mirror", default_return=None)
+# ------------
+# process-wide model cache
+# ------------
+
+_asr_models = {}
+_align_models = {}
+
+def get_asr_model(model_name, device, compute_type, vad_options, asr_options):
+    # language is a transcribe-time argument: keying on it would load a second copy after auto detection
+    key = (model_name, device, compute_type)
+    if key not in _asr_models:
+        rprint("[bold yellow] You can ignore warning of `Model was trained with torch 1.10.0+cu102, yours is 2.0.0+cu118...`[/bold yellow]")
+        _asr_models[key] = whisperx.load_model(model_name, device, compute_type=compute_type, vad_options=vad_options, asr_options=asr_options, download_root=MODEL_DIR)
+    else:
+        rprint(f"[green]♻️ Reusing loaded WHISPER model:[/green] {model_name}")
+    return _asr_models[key]
+
+def get_align_model(language, device):
+    key = (language, device)
+    if key not in _align_models:
+        # the align model comes from the hub as well, so it gets the mirror too
+        resolve_hf_endpoint()
+        _align_models[key] = whisperx.load_align_model(language_code=language, device=device)
+    return _align_models[key]
+
+def release_whisper_models():
+    """Drop cached ASR and alignment models so their memory can be reused"""
+    _asr_models.clear()
+    _align_models.clear()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+register_release_hook(release_whisper_models)
+
 def check_hf_mirror():
+    """URL of the fastest mirror that answered a ping, None if none did (or ping itself is unavailable)"""
     mirrors = {'Official': 'huggingface.co', 'Mirror': 'hf-mirror.com'}
-    fastest_url = f"https://{mirrors['Official']}"
+    fastest_url = None
     best_time = float('inf')
     rprint("[cyan]🔍 Checking HuggingFace mirrors...[/cyan]")
     for name, domain in mirrors.items():
@@ -23,21 +59,64 @@ def check_hf_mirror():
         else:
             cmd = ['ping', '-c', '1', '-W', '3', domain]
         start = time.time()
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except OSError as e:
+            rprint(f"[yellow]⚠️ Cannot run ping ({e}), skipping mirror check[/yellow]")
+            return None
         response_time = time.time() - start
         if result.returncode == 0:
             if response_time < best_time:
                 best_time = response_time
                 fastest_url = f"https://{domain}"
             rprint(f"[green]✓ {name}:[/green] {response_time:.2f}s")
-    if best_time == float('inf'):
+    if fastest_url is None:
         rprint("[yellow]⚠️ All mirrors failed, using default[/yellow]")
+        return None
     rprint(f"[cyan]🚀 Selected mirror:[/cyan] {fastest_url} ({best_time:.2f}s)")
     return fastest_url
 
+HF_MIRROR_CACHE = os.path.join(MODEL_DIR, "hf_mirror.json")
+HF_MIRROR_TTL = 24 * 3600
+DEFAULT_HF_ENDPOINT = "https://huggingface.co"
+_hf_endpoint = None
+
+def resolve_hf_endpoint():
+    """Pick the HuggingFace endpoint once: config/env override, then a probe result cached on disk for HF_MIRROR_TTL"""
+    global _hf_endpoint
+    if _hf_endpoint is None:
+        override = load_key("whisper.hf_endpoint") or os.environ.get("HF_ENDPOINT")
+        if override:
+            _hf_endpoint = override
+        else:
+            try:
+                with open(HF_MIRROR_CACHE, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if time.time() - cached["checked_at"] < HF_MIRROR_TTL and cached["endpoint"]:
+                    _hf_endpoint = cached["endpoint"]
+                    rprint(f"[cyan]🚀 Using cached mirror:[/cyan] {_hf_endpoint}")
+            except (OSError, ValueError, KeyError):
+                pass
+        if _hf_endpoint is None:
+            # only a mirror that really answered is cached; a failed probe uses the hub for this run and retries next time
+            try:
+                probed = check_hf_mirror()
+            except Exception as e:
+                rprint(f"[yellow]⚠️ Failed to check HuggingFace mirrors: {e}[/yellow]")
+                probed = None
+            _hf_endpoint = probed or DEFAULT_HF_ENDPOINT
+            if probed:
+                try:
+                    os.makedirs(MODEL_DIR, exist_ok=True)
+                    with open(HF_MIRROR_CACHE, 'w', encoding='utf-8') as f:
+                        json.dump({"endpoint": probed, "checked_at": time.time()}, f)
+                except OSError:
+                    pass
+    os.environ['HF_ENDPOINT'] = _hf_endpoint
+    return _hf_endpoint
+
 @except_handler("WhisperX processing error:")
 def transcribe_audio(raw_audio_file, vocal_audio_file, start, end):
-    os.environ['HF_ENDPOINT'] = check_hf_mirror()
     WHISPER_LANGUAGE = load_key("whisper.language")
     device = "cuda" if torch.cuda.is_available() else "cpu"
     rprint(f"🚀 Starting WhisperX using device: {device} ...")
@@ -64,33 +143,28 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end):
         rprint(f"[green]📥 Loading local WHISPER model:[/green] {local_model} ...")
         model_name = local_model
     else:
+        # only a download needs a mirror, a local model pays nothing
+        resolve_hf_endpoint()
         rprint(f"[green]📥 Using WHISPER model from HuggingFace:[/green] {model_name} ...")
 
     vad_options = {"vad_onset": 0.500,"vad_offset": 0.363}
     asr_options = {"temperatures": [0],"initial_prompt": "",}
     whisper_language = None if 'auto' in WHISPER_LANGUAGE else WHISPER_LANGUAGE
-    rprint("[bold yellow] You can ignore warning of `Model was trained with torch 1.10.0+cu102, yours is 2.0.0+cu118...`[/bold yellow]")
-    model = whisperx.load_model(model_name, device, compute_type=compute_type, language=whisper_language, vad_options=vad_options, asr_options=asr_options, download_root=MODEL_DIR)
-
-    def load_audio_segment(audio_file, start, end):
-        audio, _ = librosa.load(audio_file, sr=16000, offset=start, duration=end - start, mono=True)
-        return audio
-    raw_audio_segment = load_audio_segment(raw_audio_file, start, end)
-    vocal_audio_segment = load_audio_segment(vocal_audio_file, start, end)
+    model = get_asr_model(model_name, device, compute_type, vad_options, asr_options)
+
+    # both tracks are decoded once per run, segments are zero-copy slices
+    raw_audio_segment = get_segment(raw_audio_file, start, end)
+    vocal_audio_segment = get_segment(vocal_audio_file, start, end)
     
     # -------------------------
     # 1. transcribe raw audio
     # -------------------------
     transcribe_start_time = time.time()
     rprint("[bold green]Note: You will see Progress if working correctly ↓[/bold green]")
-    result = model.transcribe(raw_audio_segment, batch_size=batch_size, print_progress=True)
+    result = model.transcribe(raw_audio_segment, batch_size=batch_size, language=whisper_language, print_progress=True)
     transcribe_time = time.time() - transcribe_start_time
     rprint(f"[cyan]⏱️ time transcribe:[/cyan] {transcribe_time:.2f}s")
 
-    # Free GPU resources
-    del model
-    torch.cuda.empty_cache()
-
     # Save language
     update_key("whisper.language", result['language'])
     if result['language'] == 'zh' and WHISPER_LANGUAGE != 'zh':
@@ -101,15 +175,11 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end):
     # -------------------------
     align_start_time = time.time()
     # Align timestamps using vocal audio
-    model_a, metadata = whisperx.load_align_model(language_code=result["language"], device=device)
+    model_a, metadata = get_align_model(result["language"], device)
     result = whisperx.align(result["segments"], model_a, metadata, vocal_audio_segment, device, return_char_alignments=False)
     align_time = time.time() - align_start_time
     rprint(f"[cyan]⏱️ time align:[/cyan] {align_time:.2f}s")
 
-    # Free GPU resources again
-    torch.cuda.empty_cache()
-    del model_a
-
     # Adjust timestamps
     for segment in result['segments']:
         segment['start'] += start
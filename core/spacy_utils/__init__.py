@@ -1,13 +1,7 @@
-from .split_by_comma import split_by_comma_main
-from .split_by_connector import split_sentences_main
-from .split_by_mark import split_by_mark
-from .split_long_by_root import split_long_by_root_main
+from .split_engine import split_transcript
 from .load_nlp_model import init_nlp
 
 __all__ = [
-    "split_by_comma_main",
-    "split_sentences_main",
-    "split_by_mark",
-    "split_long_by_root_main",
+    "split_transcript",
     "init_nlp"
 ]
@@ -0,0 +1,103 @@
+"""
+Benchmark connector splitting: the previous re-parse loop vs. the one-pass split.
+
+    python -m core.spacy_utils.bench_split_by_connector [text_file]
+
+Without a file the transcript in output/log/cleaned_chunks.xlsx is used, split into sentences.
+"""
+import sys
+import time
+from core.spacy_utils.load_nlp_model import init_nlp
+from core.spacy_utils.split_by_mark import load_transcript_text
+from core.spacy_utils.nlp_runner import run_pipe
+from core.spacy_utils.split_by_connector import analyze_connectors, split_by_connectors, split_range_by_connectors
+
+def split_by_connectors_reparse(text, context_words=5, nlp=None):
+    """The previous implementation: one cut per fragment per round, every fragment re-parsed each round"""
+    doc = nlp(text)
+    sentences = [doc.text]
+    while True:
+        split_occurred = False
+        new_sentences = []
+        for sent in sentences:
+            doc = nlp(sent)
+            start = 0
+            for i, token in enumerate(doc):
+                split_before, _ = analyze_connectors(doc, token)
+                if i + 1 < len(doc) and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
+                    continue
+                left_words = [w.text for w in doc[max(0, token.i - context_words):token.i] if not w.is_punct]
+                right_words = [w.text for w in doc[token.i+1:min(len(doc), token.i + context_words + 1)] if not w.is_punct]
+                if len(left_words) >= context_words and len(right_words) >= context_words and split_before:
+                    new_sentences.append(doc[start:token.i].text.strip())
+                    start = token.i
+                    split_occurred = True
+                    break
+            if start < len(doc):
+                new_sentences.append(doc[start:].text.strip())
+        if not split_occurred:
+            break
+        sentences = new_sentences
+    return sentences
+
+def split_range_by_connectors_loop(doc, start, end, context_words=5):
+    """The same re-scan loop on a fixed parse, used to check the one-pass split cuts at the same places"""
+    ranges = [(start, end)]
+    while True:
+        split_occurred = False
+        new_ranges = []
+        for range_start, range_end in ranges:
+            cut = range_start
+            for token in doc[range_start:range_end]:
+                i = token.i
+                split_before, _ = analyze_connectors(doc, token)
+                if i + 1 < range_end and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
+                    continue
+                left_words = [w.text for w in doc[max(range_start, i - context_words):i] if not w.is_punct]
+                right_words = [w.text for w in doc[i+1:min(range_end, i + context_words + 1)] if not w.is_punct]
+                if len(left_words) >= context_words and len(right_words) >= context_words and split_before:
+                    new_ranges.append((cut, i))
+                    cut = i
+                    split_occurred = True
+                    break
+            if cut < range_end:
+                new_ranges.append((cut, range_end))
+        if not split_occurred:
+            break
+        ranges = new_ranges
+    return ranges
+
+class CountingNLP:
+    def __init__(self, nlp):
+        self.nlp, self.calls = nlp, 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.nlp(text)
+
+def run(sentences, nlp):
+    import core.spacy_utils.split_by_connector as module
+    module.rprint = lambda *args, **kwargs: None  # keep the timing about splitting, not console output
+
+    results = {}
+    for name, fn in [("re-parse loop", split_by_connectors_reparse), ("one pass", split_by_connectors)]:
+        counter = CountingNLP(nlp)
+        start = time.perf_counter()
+        output = [piece for sent in sentences for piece in fn(sent, nlp=counter)]
+        results[name] = (counter.calls, time.perf_counter() - start, output)
+        print(f"{name:>14}: {counter.calls:6d} parser calls, {results[name][1]:7.2f}s, {len(output)} fragments")
+
+    # on a fixed parse both algorithms must cut at the same places
+    docs = run_pipe(sentences, "parse", nlp)
+    same = sum(split_range_by_connectors(doc, 0, len(doc)) == split_range_by_connectors_loop(doc, 0, len(doc)) for doc in docs)
+    print(f"identical cuts on the same parse: {same}/{len(docs)} sentences")
+    print(f"identical text output to the re-parse loop: {results['one pass'][2] == results['re-parse loop'][2]}")
+
+if __name__ == "__main__":
+    nlp = init_nlp()
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+    else:
+        sentences = [sent.text.strip() for sent in nlp(load_transcript_text()).sents]
+    run(sentences, nlp)
@@ -10,10 +10,15 @@ def get_spacy_model(language: str):
         rprint(f"[yellow]Spacy model does not support '{language}', using en_core_web_md model as fallback...[/yellow]")
     return model
 
+# process-wide model cache, so split_by_spacy, split_sentences_by_meaning and batch tasks load each model once
+_models = {}
+
 @except_handler("Failed to load NLP Spacy model")
 def init_nlp():
     language = "en" if load_key("whisper.language") == "en" else load_key("whisper.detected_language")
     model = get_spacy_model(language)
+    if model in _models:
+        return _models[model]
     rprint(f"[blue]⏳ Loading NLP Spacy model: <{model}> ...[/blue]")
     try:
         nlp = spacy.load(model)
@@ -23,6 +28,7 @@ def init_nlp():
         download(model)
         nlp = spacy.load(model)
     rprint("[green]✅ NLP Spacy model loaded successfully![/green]")
+    _models[model] = nlp
     return nlp
 
 # --------------------
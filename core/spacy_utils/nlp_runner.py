@@ -0,0 +1,36 @@
+from typing import Iterable, List
+from core.utils import load_key
+from core.spacy_utils.load_nlp_model import init_nlp
+
+# ------------
+# batched nlp.pipe with only the components each stage reads
+# ------------
+
+# components a stage does not need; the tok2vec/tagger/parser chain stays because pos_/dep_/sents come from it,
+# and static vectors stay because the md models' tok2vec uses them as features
+STAGE_DISABLE = {
+    "tokenize": None,              # tokenizer only: every pipeline component is disabled
+    "parse": ["ner", "lemmatizer"],  # mark / comma / connector / root rules: pos_, dep_, head, sentence boundaries
+}
+
+def _disabled(nlp, stage):
+    disable = STAGE_DISABLE[stage]
+    if disable is None:
+        return list(nlp.pipe_names)
+    return [name for name in disable if name in nlp.pipe_names]
+
+def run_pipe(texts: Iterable[str], stage: str, nlp=None) -> List:
+    """Docs for `texts` in order, processed in batches with the stage's unused components disabled"""
+    nlp = nlp or init_nlp()
+    texts = list(texts)
+    n_process = load_key("spacy_pipe.n_process")
+    # worker processes only pay off for larger inputs
+    if len(texts) < 2 * load_key("spacy_pipe.batch_size"):
+        n_process = 1
+    return list(nlp.pipe(texts, batch_size=load_key("spacy_pipe.batch_size"), n_process=n_process, disable=_disabled(nlp, stage)))
+
+def parse(text: str, nlp=None):
+    return run_pipe([text], "parse", nlp)[0]
+
+def token_counts(texts: Iterable[str], nlp=None) -> List[int]:
+    return [len(doc) for doc in run_pipe(texts, "tokenize", nlp)]
@@ -1,6 +1,5 @@
-import os
 import warnings
-from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_COMMA_FILE, SPLIT_BY_CONNECTOR_FILE
+from core.spacy_utils.load_nlp_model import init_nlp
 from core.utils import rprint
 
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -81,75 +80,44 @@ def analyze_connectors(doc, token):
     else:
         return True, False
 
-def split_by_connectors(text, context_words=5, nlp=None):
-    doc = nlp(text)
-    sentences = [doc.text]  # init
-    
-    while True:
-        # Handle each task with a single cut
-        # avoiding the fragmentation of a sentence into multiple parts at the same time.
-        split_occurred = False
-        new_sentences = []
-        
-        for sent in sentences:
-            doc = nlp(sent)
-            start = 0
-            
-            for i, token in enumerate(doc):
-                split_before, _ = analyze_connectors(doc, token)
-                
-                if i + 1 < len(doc) and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
-                    continue
-                
-                left_words = doc[max(0, token.i - context_words):token.i]
-                right_words = doc[token.i+1:min(len(doc), token.i + context_words + 1)]
-                
-                left_words = [word.text for word in left_words if not word.is_punct]
-                right_words = [word.text for word in right_words if not word.is_punct]
-                
-                if len(left_words) >= context_words and len(right_words) >= context_words and split_before:
-                    rprint(f"[yellow]✂️  Split before '{token.text}': {' '.join(left_words)}| {token.text} {' '.join(right_words)}[/yellow]")
-                    new_sentences.append(doc[start:token.i].text.strip())
-                    start = token.i
-                    split_occurred = True
-                    break
-            
-            if start < len(doc):
-                new_sentences.append(doc[start:].text.strip())
+def connector_split_points(doc, start, end, context_words=5):
+    """Token indices in doc[start:end] to split before, found in one left-to-right pass.
+
+    Same result as cutting once per fragment and rescanning until nothing changes: a fragment
+    left of a cut never gains a split (its right context only shrinks), and the fragment right
+    of it starts at the cut, so its left context is clipped there.
+    """
+    points = []
+    cut = start
+    for token in doc[start:end]:
+        i = token.i
+        if i + 1 < end and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
+            continue
         
-        if not split_occurred:
-            break
+        left_words = [word.text for word in doc[max(cut, i - context_words):i] if not word.is_punct]
+        if len(left_words) < context_words:
+            continue
+        right_words = [word.text for word in doc[i+1:min(end, i + context_words + 1)] if not word.is_punct]
+        if len(right_words) < context_words:
+            continue
         
-        sentences = new_sentences
-    
-    return sentences
+        split_before, _ = analyze_connectors(doc, token)
+        if split_before:
+            rprint(f"[yellow]✂️  Split before '{token.text}': {' '.join(left_words)}| {token.text} {' '.join(right_words)}[/yellow]")
+            points.append(i)
+            cut = i
+    return points
 
-def split_sentences_main(nlp):
-    # Read input sentences
-    with open(SPLIT_BY_COMMA_FILE, "r", encoding="utf-8") as input_file:
-        sentences = input_file.readlines()
-    
-    all_split_sentences = []
-    # Process each input sentence
-    for sentence in sentences:
-        split_sentences = split_by_connectors(sentence.strip(), nlp = nlp)
-        all_split_sentences.extend(split_sentences)
-    
-    with open(SPLIT_BY_CONNECTOR_FILE, "w+", encoding="utf-8") as output_file:
-        for sentence in all_split_sentences:
-            output_file.write(sentence + "\n")
-        # do not add a newline at the end of the file
-        output_file.seek(output_file.tell() - 1, os.SEEK_SET)
-        output_file.truncate()
+def split_range_by_connectors(doc, start, end, context_words=5):
+    """Connector splitting of doc[start:end] on the existing parse, returning token ranges"""
+    bounds = [start] + connector_split_points(doc, start, end, context_words) + [end]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
 
-    # delete the original file
-    os.remove(SPLIT_BY_COMMA_FILE)
-    
-    rprint(f"[green]💾 Sentences split by connectors saved to →  `{SPLIT_BY_CONNECTOR_FILE}`[/green]")
+def split_by_connectors(text, context_words=5, nlp=None):
+    doc = nlp(text)
+    return [doc[start:end].text.strip() for start, end in split_range_by_connectors(doc, 0, len(doc), context_words)] or [doc.text]
 
 if __name__ == "__main__":
     nlp = init_nlp()
-    split_sentences_main(nlp)
-    # nlp = init_nlp()
-    # a = "and show the specific differences that make a difference between a breakaway that results in a goal in the NHL versus one that doesn't."
-    # print(split_by_connectors(a, nlp))
\ No newline at end of file
+    a = "and show the specific differences that make a difference between a breakaway that results in a goal in the NHL versus one that doesn't."
+    print(split_by_connectors(a, nlp=nlp))
\ No newline at end of file
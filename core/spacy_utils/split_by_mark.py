@@ -1,13 +1,12 @@
-import os
 import pandas as pd
 import warnings
-from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_MARK_FILE
+from core.spacy_utils.load_nlp_model import init_nlp
 from core.utils.config_utils import load_key, get_joiner
 from rich import print as rprint
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-def split_by_mark(nlp):
+def load_transcript_text():
     whisper_language = load_key("whisper.language")
     language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language # consider force english case
     joiner = get_joiner(language)
@@ -16,48 +15,39 @@ def split_by_mark(nlp):
     chunks.text = chunks.text.apply(lambda x: x.strip('"').strip(""))
     
     # join with joiner
-    input_text = joiner.join(chunks.text.to_list())
+    return joiner.join(chunks.text.to_list())
 
-    doc = nlp(input_text)
+def split_ranges_by_mark(doc):
+    """Sentence token ranges of `doc`, with - and ... continuations and punctuation-only sentences merged"""
     assert doc.has_annotation("SENT_START")
 
     # skip - and ...
-    sentences_by_mark = []
-    current_sentence = []
+    ranges = []
+    last_text = None
     
     # iterate all sentences
     for sent in doc.sents:
         text = sent.text.strip()
         
         # check if the current sentence ends with - or ...
-        if current_sentence and (
+        if ranges and (
             text.startswith('-') or 
             text.startswith('...') or
-            current_sentence[-1].endswith('-') or
-            current_sentence[-1].endswith('...')
+            last_text.endswith('-') or
+            last_text.endswith('...')
         ):
-            current_sentence.append(text)
+            ranges[-1][1] = sent.end
+        elif ranges and text in [',', '.', '，', '。', '？', '！']:
+            # ! If the current sentence contains only punctuation, merge it with the previous one, this happens in Chinese, Japanese, etc.
+            ranges[-1][1] = sent.end
         else:
-            if current_sentence:
-                sentences_by_mark.append(' '.join(current_sentence))
-                current_sentence = []
-            current_sentence.append(text)
-    
-    # add the last sentence
-    if current_sentence:
-        sentences_by_mark.append(' '.join(current_sentence))
+            ranges.append([sent.start, sent.end])
+        last_text = text
 
-    with open(SPLIT_BY_MARK_FILE, "w", encoding="utf-8") as output_file:
-        for i, sentence in enumerate(sentences_by_mark):
-            if i > 0 and sentence.strip() in [',', '.', '，', '。', '？', '！']:
-                # ! If the current line contains only punctuation, merge it with the previous line, this happens in Chinese, Japanese, etc.
-                output_file.seek(output_file.tell() - 1, os.SEEK_SET)  # Move to the end of the previous line
-                output_file.write(sentence)  # Add the punctuation
-            else:
-                output_file.write(sentence + "\n")
-    
-    rprint(f"[green]💾 Sentences split by punctuation marks saved to →  `{SPLIT_BY_MARK_FILE}`[/green]")
+    return [tuple(r) for r in ranges]
 
 if __name__ == "__main__":
     nlp = init_nlp()
-    split_by_mark(nlp)
+    doc = nlp(load_transcript_text())
+    for start, end in split_ranges_by_mark(doc):
+        print(doc[start:end].text.strip())
@@ -0,0 +1,76 @@
+import os
+import string
+from core.spacy_utils.nlp_runner import parse
+from core.spacy_utils.load_nlp_model import SPLIT_BY_MARK_FILE, SPLIT_BY_COMMA_FILE, SPLIT_BY_CONNECTOR_FILE
+from core.spacy_utils.split_by_mark import load_transcript_text, split_ranges_by_mark
+from core.spacy_utils.split_by_comma import split_range_by_comma
+from core.spacy_utils.split_by_connector import split_range_by_connectors
+from core.spacy_utils.split_long_by_root import split_range_by_root
+from core.utils import rprint
+from core.utils.models import _3_1_SPLIT_BY_NLP
+
+# ------------
+# parse the transcript once, every rule works on token ranges of that single Doc
+# ------------
+
+def _trim(doc, start, end):
+    """Drop whitespace tokens at both ends, like .strip() did on the text"""
+    while start < end and doc[start].is_space:
+        start += 1
+    while end > start and doc[end - 1].is_space:
+        end -= 1
+    return start, end
+
+def _apply(doc, ranges, rule):
+    result = []
+    for start, end in ranges:
+        for piece in rule(doc, *_trim(doc, start, end)):
+            piece = _trim(doc, *piece)
+            if piece[0] < piece[1]:
+                result.append(piece)
+    return result
+
+def _dump(doc, ranges, path):
+    with open(path, "w", encoding="utf-8") as output_file:
+        output_file.write("\n".join(doc[start:end].text.strip() for start, end in ranges))
+    rprint(f"[green]💾 Debug dump saved to →  `{path}`[/green]")
+
+def split_transcript(nlp, debug=False):
+    """mark → comma → connector → root on one parse; writes _3_1_SPLIT_BY_NLP.
+
+    With `debug` the ranges after each intermediate stage are dumped to output/log as before.
+    """
+    doc = parse(load_transcript_text(), nlp)
+
+    ranges = [_trim(doc, *r) for r in split_ranges_by_mark(doc)]
+    rprint(f"[green]✅ Split by punctuation marks: {len(ranges)} sentences[/green]")
+    if debug:
+        _dump(doc, ranges, SPLIT_BY_MARK_FILE)
+
+    ranges = _apply(doc, ranges, split_range_by_comma)
+    rprint(f"[green]✅ Split by commas: {len(ranges)} sentences[/green]")
+    if debug:
+        _dump(doc, ranges, SPLIT_BY_COMMA_FILE)
+
+    ranges = _apply(doc, ranges, split_range_by_connectors)
+    rprint(f"[green]✅ Split by connectors: {len(ranges)} sentences[/green]")
+    if debug:
+        _dump(doc, ranges, SPLIT_BY_CONNECTOR_FILE)
+
+    all_split_sentences = [sent for start, end in ranges for sent in split_range_by_root(doc, start, end)]
+
+    punctuation = string.punctuation + "'" + '"'  # include all punctuation and apostrophe ' and "
+
+    os.makedirs(os.path.dirname(_3_1_SPLIT_BY_NLP), exist_ok=True)
+    with open(_3_1_SPLIT_BY_NLP, "w", encoding="utf-8") as output_file:
+        for i, sentence in enumerate(all_split_sentences):
+            stripped_sentence = sentence.strip()
+            if not stripped_sentence or all(char in punctuation for char in stripped_sentence):
+                rprint(f"[yellow]⚠️  Warning: Empty or punctuation-only line detected at index {i}[/yellow]")
+                if i > 0:
+                    all_split_sentences[i-1] += sentence
+                continue
+            output_file.write(sentence + "\n")
+
+    rprint(f"[green]💾 Long sentences split by root saved to →  {_3_1_SPLIT_BY_NLP}[/green]")
+    return all_split_sentences
@@ -4,6 +4,7 @@ from rich.console import Console
 from rich.table import Table
 from rich import box
 from core.utils import *
+from core.utils.llm_engine import ask_gpt_async, run_sync
 console = Console()
 
 def valid_translate_result(result: dict, required_keys: list, required_sub_keys: list):
@@ -18,20 +19,20 @@ def valid_translate_result(result: dict, required_keys: list, required_sub_keys:
 
     return {"status": "success", "message": "Translation completed"}
 
-def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index = 0):
+async def translate_lines_async(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index = 0):
     shared_prompt = generate_shared_prompt(previous_content_prompt, after_cotent_prompt, summary_prompt, things_to_note_prompt)
 
     # Retry translation if the length of the original text and the translated text are not the same, or if the specified key is missing
-    def retry_translation(prompt, length, step_name):
+    async def retry_translation(prompt, length, step_name):
         def valid_faith(response_data):
             return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], ['direct'])
         def valid_express(response_data):
             return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], ['free'])
         for retry in range(3):
             if step_name == 'faithfulness':
-                result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_faith, log_title=f'translate_{step_name}')
+                result = await ask_gpt_async(prompt, resp_type='json', valid_def=valid_faith, log_title=f'translate_{step_name}', bypass_cache=retry > 0)
             elif step_name == 'expressiveness':
-                result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_express, log_title=f'translate_{step_name}')
+                result = await ask_gpt_async(prompt, resp_type='json', valid_def=valid_express, log_title=f'translate_{step_name}', bypass_cache=retry > 0)
             if len(lines.split('\n')) == len(result):
                 return result
             if retry != 2:
@@ -40,7 +41,7 @@ def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_
 
     ## Step 1: Faithful to the Original Text
     prompt1 = get_prompt_faithfulness(lines, shared_prompt)
-    faith_result = retry_translation(prompt1, len(lines.split('\n')), 'faithfulness')
+    faith_result = await retry_translation(prompt1, len(lines.split('\n')), 'faithfulness')
 
     for i in faith_result:
         faith_result[i]["direct"] = faith_result[i]["direct"].replace('\n', ' ')
@@ -64,7 +65,7 @@ def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_
 
     ## Step 2: Express Smoothly  
     prompt2 = get_prompt_expressiveness(faith_result, lines, shared_prompt)
-    express_result = retry_translation(prompt2, len(lines.split('\n')), 'expressiveness')
+    express_result = await retry_translation(prompt2, len(lines.split('\n')), 'expressiveness')
 
     table = Table(title="Translation Results", show_header=False, box=box.ROUNDED)
     table.add_column("Translations", style="bold")
@@ -85,6 +86,9 @@ def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_
 
     return translate_result, lines
 
+def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index = 0):
+    return run_sync(translate_lines_async(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index))
+
 
 if __name__ == '__main__':
     # test e.g.
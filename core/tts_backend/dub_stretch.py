@@ -0,0 +1,91 @@
+from typing import Tuple
+
+import pandas as pd
+from rich import print as rprint
+
+from core.utils.models import _AUDIO_TMP_DIR, _AUDIO_SEGS_DIR
+from core.asr_backend.media_info import get_audio_duration
+from core.tts_backend.time_stretch import stretch_files, truncate_file
+
+# ------------
+# per-chunk stretch & timeline, run in process pool workers by _10_gen_audio.merge_chunks.
+# keep the imports light: a spawned worker imports this module, never a tts backend
+# ------------
+
+TEMP_FILE_TEMPLATE = f"{_AUDIO_TMP_DIR}/{{}}_temp.wav"
+OUTPUT_FILE_TEMPLATE = f"{_AUDIO_SEGS_DIR}/{{}}.wav"
+
+def parse_df_srt_time(time_str: str) -> float:
+    """Convert SRT time format to seconds"""
+    hours, minutes, seconds = time_str.strip().split(':')
+    seconds, milliseconds = seconds.split('.')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(milliseconds) / 1000
+
+def process_chunk(chunk_df: pd.DataFrame, accept: float, min_speed: float) -> tuple[float, bool]:
+    """Process audio chunk and calculate speed factor"""
+    chunk_durs = chunk_df['real_dur'].sum()
+    tol_durs = chunk_df['tol_dur'].sum()
+    durations = tol_durs - chunk_df.iloc[-1]['tolerance']
+    all_gaps = chunk_df['gap'].sum() - chunk_df.iloc[-1]['gap']
+    
+    keep_gaps = True
+    speed_var_error = 0.1
+
+    if (chunk_durs + all_gaps) / accept < durations:
+        speed_factor = max(min_speed, (chunk_durs + all_gaps) / (durations-speed_var_error))
+    elif chunk_durs / accept < durations:
+        speed_factor = max(min_speed, chunk_durs / (durations-speed_var_error))
+        keep_gaps = False
+    elif (chunk_durs + all_gaps) / accept < tol_durs:
+        speed_factor = max(min_speed, (chunk_durs + all_gaps) / (tol_durs-speed_var_error))
+    else:
+        speed_factor = chunk_durs / (tol_durs-speed_var_error)
+        keep_gaps = False
+        
+    return round(speed_factor, 3), keep_gaps
+
+def _row_lines(row) -> list:
+    return eval(row['lines']) if isinstance(row['lines'], str) else row['lines']
+
+def process_dub_chunk(chunk_df: pd.DataFrame, accept: float, min_speed: float, label: str) -> Tuple[float, list]:
+    """Stretch one cut_off chunk and lay out its timeline; depends only on the chunk's own rows.
+
+    Returns the speed factor and the new_sub_times of every row, in row order.
+    """
+    chunk_df = chunk_df.reset_index(drop=True)
+    speed_factor, keep_gaps = process_chunk(chunk_df, accept, min_speed)
+
+    # 🎯 Step1: Start processing new timeline
+    chunk_start_time = parse_df_srt_time(chunk_df.iloc[0]['start_time'])
+    chunk_end_time = parse_df_srt_time(chunk_df.iloc[-1]['end_time']) + chunk_df.iloc[-1]['tolerance'] # 加上tolerance才是这一块的结束
+    cur_time = chunk_start_time
+    # 🔄 Step2: Stretch every line of the chunk in one batch and save as OUTPUT_FILE_TEMPLATE
+    line_keys = [f"{r['number']}_{line_index}" for _, r in chunk_df.iterrows() for line_index in range(len(_row_lines(r)))]
+    durations = iter(stretch_files([TEMP_FILE_TEMPLATE.format(k) for k in line_keys],
+                                   [OUTPUT_FILE_TEMPLATE.format(k) for k in line_keys], speed_factor))
+    all_sub_times = []
+    for i, row in chunk_df.iterrows():
+        # If i is not 0, which is not the first row of the chunk, cur_time needs to be added with the gap of the previous row, remember to divide by speed_factor
+        if i != 0 and keep_gaps:
+            cur_time += chunk_df.iloc[i-1]['gap']/speed_factor
+        new_sub_times = []
+        for _ in _row_lines(row):
+            ad_dur = next(durations)
+            new_sub_times.append([cur_time, cur_time+ad_dur])
+            cur_time += ad_dur
+        all_sub_times.append(new_sub_times)
+    # 🎯 Step3: Choose emoji based on speed_factor and accept comparison
+    emoji = "⚡" if speed_factor <= accept else "⚠️"
+    rprint(f"[cyan]{emoji} Processed chunk {label} with speed factor {speed_factor}[/cyan]")
+    # 🔄 Step4: Check if the last row exceeds the range
+    if cur_time > chunk_end_time:
+        time_diff = cur_time - chunk_end_time
+        if time_diff <= 0.6:  # If exceeding time is within 0.6 seconds, truncate the last audio
+            rprint(f"[yellow]⚠️ Chunk {label} exceeds by {time_diff:.3f}s, truncating last audio[/yellow]")
+            last_file = OUTPUT_FILE_TEMPLATE.format(line_keys[-1])
+            truncate_file(last_file, get_audio_duration(last_file) - time_diff)
+            # Update the last timestamp
+            all_sub_times[-1][-1][1] = chunk_end_time
+        else:
+            raise Exception(f"Chunk {label} exceeds the chunk end time {chunk_end_time:.2f} seconds with current time {cur_time:.2f} seconds")
+    return speed_factor, all_sub_times
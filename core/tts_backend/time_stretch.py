@@ -0,0 +1,95 @@
+import subprocess
+import numpy as np
+import soundfile as sf
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Optional, Sequence, Tuple
+from core.asr_backend.media_info import probe_audio
+
+# ------------
+# WSOLA time-stretch on in-memory sample buffers
+# ------------
+
+FRAME_MS = 20      # analysis/synthesis window
+TOLERANCE_MS = 5   # how far a frame may slide to stay in phase with the previous one
+
+def wsola(samples: np.ndarray, sr: int, target_len: int) -> np.ndarray:
+    """Stretch `samples` (frames, channels) to exactly `target_len` frames without changing pitch."""
+    n = len(samples)
+    if target_len <= 0 or n == 0:
+        return np.zeros((max(target_len, 0), samples.shape[1]), dtype=np.float32)
+    if target_len == n:
+        return samples.astype(np.float32, copy=True)
+
+    frame = max(2 * int(sr * FRAME_MS / 2000), 16)
+    syn_hop = frame // 2
+    tol = max(int(sr * TOLERANCE_MS / 1000), 1)
+    ana_hop = syn_hop * n / target_len
+    n_frames = -(-target_len // syn_hop) + 1
+
+    # pad so every candidate window, shifted by up to ±tol, stays inside the buffer
+    pad_end = frame + 2 * tol + int(np.ceil(ana_hop))
+    padded = np.pad(samples.astype(np.float32), ((tol, int(n_frames * ana_hop) + pad_end), (0, 0)))
+    mono = padded.mean(axis=1)
+    window = np.hanning(frame + 1)[:frame].astype(np.float32)[:, None]
+
+    out = np.zeros(((n_frames + 1) * syn_hop + frame, samples.shape[1]), dtype=np.float32)
+    weight = np.zeros((len(out), 1), dtype=np.float32)
+    prev = None
+    for k in range(n_frames):
+        pos = tol + int(round(k * ana_hop))
+        if prev is not None:
+            # pick the candidate most similar to the natural continuation of the previous frame
+            natural = mono[prev + syn_hop:prev + syn_hop + frame]
+            candidates = sliding_window_view(mono[pos - tol:pos + tol + frame], frame)
+            pos += int(np.argmax(candidates @ natural)) - tol
+        out[k * syn_hop:k * syn_hop + frame] += padded[pos:pos + frame] * window
+        weight[k * syn_hop:k * syn_hop + frame] += window
+        prev = pos
+    out /= np.maximum(weight, 1e-3)
+    return out[:target_len]
+
+# ------------
+# file i/o: tts backends may leave mp3 or raw http bodies behind a .wav name, so decode anything
+# ------------
+
+def _ffmpeg_decode(audio_file: str, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    if sample_rate is None or channels is None:
+        info = probe_audio(audio_file)
+        sample_rate, channels = sample_rate or info['sample_rate'], channels or info['channels']
+    cmd = ['ffmpeg', '-v', 'error', '-i', audio_file, '-vn', '-ac', str(channels), '-ar', str(sample_rate), '-f', 'f32le', '-']
+    raw = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, channels), sample_rate
+
+def read_audio(audio_file: str, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """(frames, channels) float32 samples and their rate; libsndfile when it can, ffmpeg for anything else.
+
+    Asking for a `sample_rate` or `channels` the file does not have lets ffmpeg convert while decoding.
+    """
+    try:
+        samples, sr = sf.read(audio_file, dtype='float32', always_2d=True)
+    except RuntimeError:
+        return _ffmpeg_decode(audio_file, sample_rate, channels)
+    if (sample_rate or sr) != sr or (channels or samples.shape[1]) != samples.shape[1]:
+        return _ffmpeg_decode(audio_file, sample_rate or sr, channels or samples.shape[1])
+    return samples, sr
+
+def write_wav(audio_file: str, samples: np.ndarray, sample_rate: int) -> None:
+    """Always a 16-bit PCM wav, whatever container the input came in"""
+    sf.write(audio_file, np.clip(samples, -1, 1), sample_rate, format='WAV', subtype='PCM_16')
+
+def stretch_file(input_file: str, output_file: str, speed_factor: float) -> float:
+    """Write `input_file` sped up by `speed_factor` to `output_file` and return the new duration in seconds."""
+    samples, sr = read_audio(input_file)
+    target_len = int(round(len(samples) / speed_factor))
+    stretched = samples if abs(speed_factor - 1.0) < 0.001 else wsola(samples, sr, target_len)
+    write_wav(output_file, stretched, sr)
+    return len(stretched) / sr
+
+def stretch_files(input_files: Sequence[str], output_files: Sequence[str], speed_factor: float) -> List[float]:
+    """Stretch every line of a chunk by the same factor in one call, returning the exact output durations."""
+    return [stretch_file(i, o, speed_factor) for i, o in zip(input_files, output_files)]
+
+def truncate_file(audio_file: str, duration: float) -> None:
+    """Cut `audio_file` down to its first `duration` seconds, in place."""
+    samples, sr = read_audio(audio_file)
+    write_wav(audio_file, samples[:max(int(duration * sr), 0)], sr)
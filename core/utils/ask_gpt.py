@@ -1,66 +1,87 @@
-import os
-import json
+import time
 from threading import Lock
 import json_repair
 from core.utils.config_utils import load_key
-from core.utils.copilot_api_working import get_working_copilot_client
+from core.utils.copilot_api_working import get_working_copilot_client, CopilotRequestError
 from rich import print as rprint
 from core.utils.decorator import except_handler
+from core.utils.gpt_cache import load_cache, save_cache
 
 # ------------
-# cache gpt response
+# pooled api clients
 # ------------
 
-LOCK = Lock()
-GPT_LOG_FOLDER = 'output/gpt_log'
-
-def _save_cache(model, prompt, resp_content, resp_type, resp, message=None, log_title="default"):
-    with LOCK:
-        logs = []
-        file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
-        os.makedirs(os.path.dirname(file), exist_ok=True)
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-        logs.append({"model": model, "prompt": prompt, "resp_content": resp_content, "resp_type": resp_type, "resp": resp, "message": message})
-        with open(file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=4)
-
-def _load_cache(prompt, resp_type, log_title):
-    with LOCK:
-        file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                for item in json.load(f):
-                    if item["prompt"] == prompt and item["resp_type"] == resp_type:
-                        return item["resp"]
-        return False
+COPILOT_MODEL = "gpt-4o"  # Force use GPT-4o for Copilot
+COPILOT_RETRY_AFTER = 300  # seconds before retrying a failed Copilot initialization
+
+CLIENT_LOCK = Lock()
+_openai_clients = {}
+_copilot_failed_at = None
+
+def _get_openai_client(base_url, api_key):
+    """One long-lived OpenAI client per (base_url, key); its httpx pool keeps connections alive across threads"""
+    with CLIENT_LOCK:
+        client = _openai_clients.get((base_url, api_key))
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, base_url=base_url)
+            _openai_clients[(base_url, api_key)] = client
+        return client
+
+def _get_copilot_client():
+    """Return the shared Copilot client, or None while a recent initialization failure is still fresh"""
+    global _copilot_failed_at
+    with CLIENT_LOCK:
+        if _copilot_failed_at is not None and time.time() - _copilot_failed_at < COPILOT_RETRY_AFTER:
+            return None
+        try:
+            client = get_working_copilot_client()
+            _copilot_failed_at = None
+            return client
+        except Exception as e:
+            _copilot_failed_at = time.time()
+            rprint(f"[yellow]Warning: Failed to initialize Copilot client: {e}[/yellow]")
+            rprint("[yellow]Falling back to OpenAI API[/yellow]")
+            return None
+
+def _candidate_models():
+    models = [COPILOT_MODEL]
+    if load_key("api.model") != COPILOT_MODEL:
+        models.append(load_key("api.model"))
+    return models
+
+def lookup_cache(prompt, resp_type=None):
+    """Return a cached response from any provider that may have answered this prompt, or False"""
+    for model in _candidate_models():
+        cached = load_cache(model, prompt, resp_type)
+        if cached:
+            return cached
+    return False
+
+def current_provider():
+    """Name of the endpoint the next uncached request will go to"""
+    return "copilot" if _get_copilot_client() is not None else load_key("api.base_url")
 
 # ------------
 # ask gpt once
 # ------------
 
-@except_handler("GPT request failed", retry=5)
-def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
-    # Check if we have Copilot access token, fallback to original OpenAI if not
-    try:
-        copilot_client = get_working_copilot_client()
-        use_copilot = True
-    except Exception as e:
-        rprint(f"[yellow]Warning: Failed to initialize Copilot client: {e}[/yellow]")
-        rprint("[yellow]Falling back to OpenAI API[/yellow]")
-        use_copilot = False
-    
-    # check cache
-    cached = _load_cache(prompt, resp_type, log_title)
+# copilot transport errors are retried inside the client, only bad responses are retried here
+@except_handler("GPT request failed", retry=5, no_retry=(CopilotRequestError,))
+def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default", bypass_cache=False):
+    # check cache first, a cached response never needs an api client
+    # bypass_cache forces a fresh answer (e.g. a retry after an unusable cached one); it still overwrites the cache
+    cached = None if bypass_cache else lookup_cache(prompt, resp_type)
     if cached:
         rprint("use cache response")
         return cached
 
-    if use_copilot:
+    # Check if we have Copilot access token, fallback to original OpenAI if not
+    copilot_client = _get_copilot_client()
+
+    if copilot_client is not None:
         # Use Copilot API
-        model = "gpt-4o"  # Force use GPT-4o for Copilot
-        
+        model = COPILOT_MODEL
         messages = [{"role": "user", "content": prompt}]
         response_format = {"type": "json_object"} if resp_type == "json" else None
 
@@ -77,16 +98,14 @@ def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
         # Fallback to original OpenAI API
         if not load_key("api.key"):
             raise ValueError("API key is not set")
-            
-        from openai import OpenAI
-        
+
         model = load_key("api.model")
         base_url = load_key("api.base_url")
         if 'ark' in base_url:
             base_url = "https://ark.cn-beijing.volces.com/api/v3" # huoshan base url
         elif 'v1' not in base_url:
             base_url = base_url.strip('/') + '/v1'
-        client = OpenAI(api_key=load_key("api.key"), base_url=base_url)
+        client = _get_openai_client(base_url, load_key("api.key"))
         response_format = {"type": "json_object"} if resp_type == "json" and load_key("api.llm_support_json") else None
 
         messages = [{"role": "user", "content": prompt}]
@@ -121,10 +140,11 @@ def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
     if valid_def:
         valid_resp = valid_def(resp)
         if valid_resp['status'] != 'success':
-            _save_cache(model, prompt, resp_content, resp_type, resp, log_title="error", message=valid_resp['message'])
+            # kept as an error row; `cleanup` exports it to error.json with the other logs
+            save_cache(model, prompt, resp_content, resp_type, resp, log_title="error", message=valid_resp['message'])
             raise ValueError(f"❎ API response error: {valid_resp['message']}")
 
-    _save_cache(model, prompt, resp_content, resp_type, resp, log_title=log_title)
+    save_cache(model, prompt, resp_content, resp_type, resp, log_title=log_title)
     return resp
 
 
@@ -1,5 +1,10 @@
 from ruamel.yaml import YAML
 import threading
+import functools
+import copy
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 CONFIG_PATH = 'config.yaml'
 lock = threading.Lock()
@@ -7,14 +12,143 @@ lock = threading.Lock()
 yaml = YAML()
 yaml.preserve_quotes = True
 
+# -----------------------
+# cached config snapshot
+# -----------------------
+
+_snapshot = None
+_snapshot_stamp = None
+_stats = {"reloads": 0, "writes": 0, "hits": 0}
+# separate from `lock` so the hit counter on the fast path never waits for a reload or a write
+_stats_lock = threading.Lock()
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+def _to_plain(node):
+    """Convert ruamel containers into plain dict/list so the snapshot is detached from the yaml tree"""
+    if isinstance(node, dict):
+        return {k: _to_plain(v) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_to_plain(v) for v in node]
+    return node
+
+def _file_stamp():
+    st = os.stat(CONFIG_PATH)
+    return (st.st_mtime_ns, st.st_size)
+
+def _set_snapshot(data, stamp):
+    global _snapshot, _snapshot_stamp
+    _snapshot = _to_plain(data)
+    _snapshot_stamp = stamp
+
+def _get_snapshot():
+    """Return the parsed config, re-parsing only when config.yaml changed on disk"""
+    stamp = _file_stamp()
+    if stamp == _snapshot_stamp:
+        _count("hits")
+        return _snapshot
+    with lock:
+        stamp = _file_stamp()
+        if stamp != _snapshot_stamp:
+            with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
+                data = yaml.load(file)
+            _set_snapshot(data, stamp)
+            _count("reloads")
+        return _snapshot
+
+# -----------------------
+# job-scoped overlays
+# -----------------------
+
+# the active layers belong to the job's context, not the process: a batch job running in one thread is
+# invisible to the Streamlit UI or another job in the next. Worker threads join a job through in_job_context.
+_overlays = ContextVar("config_overlays", default=())
+_merged = None
+_merged_key = None
+
+def _parent_of(data, key):
+    """Walk to the dict holding the last part of a dotted key, raising KeyError if any part is missing"""
+    keys = key.split('.')
+    current = data
+    for k in keys[:-1]:
+        if isinstance(current, dict) and k in current:
+            current = current[k]
+        else:
+            raise KeyError(f"Key '{k}' not found in configuration")
+    if not (isinstance(current, dict) and keys[-1] in current):
+        raise KeyError(f"Key '{keys[-1]}' not found in configuration")
+    return current, keys[-1]
+
+def _set_path(data, key, new_value):
+    parent, last = _parent_of(data, key)
+    parent[last] = new_value
+
+def _get_view():
+    """Return the base snapshot with every active overlay layer applied on top"""
+    global _merged, _merged_key
+    base = _get_snapshot()
+    layers = _overlays.get()
+    if not layers:
+        return base
+    with lock:
+        merged_key = (_snapshot_stamp, tuple(tuple(layer.items()) for layer in layers))
+        if merged_key != _merged_key:
+            merged = copy.deepcopy(_snapshot)
+            for layer in layers:
+                for k, v in layer.items():
+                    _set_path(merged, k, v)
+            _merged, _merged_key = merged, merged_key
+        return _merged
+
+@contextmanager
+def config_overlay(overrides=None):
+    """Resolve load_key through a per-job layer of dotted-key overrides and route update_key into it.
+    config.yaml is left untouched, and only the current context (plus workers bound with in_job_context) sees the layer."""
+    layer = {}
+    base = _get_snapshot()
+    for k, v in (overrides or {}).items():
+        _parent_of(base, k)
+        layer[k] = v
+    token = _overlays.set(_overlays.get() + (layer,))
+    try:
+        yield layer
+    finally:
+        _overlays.reset(token)
+
+def current_overlays():
+    return _overlays.get()
+
+@contextmanager
+def use_overlays(layers):
+    """Run a block with the given overlay layers, e.g. ones captured on another thread"""
+    token = _overlays.set(layers)
+    try:
+        yield
+    finally:
+        _overlays.reset(token)
+
+def in_job_context(func):
+    """Bind `func` to the overlays active now, so a thread pool worker resolves load_key like its caller"""
+    layers = _overlays.get()
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_overlays(layers):
+            return func(*args, **kwargs)
+    return wrapper
+
+def config_stats():
+    """Counters of the config cache: reloads from disk, writes by update_key and cache hits"""
+    with _stats_lock:
+        return dict(_stats)
+
 # -----------------------
 # load & update config
 # -----------------------
 
 def load_key(key):
-    with lock:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
-            data = yaml.load(file)
+    data = _get_view()
 
     keys = key.split('.')
     value = data
@@ -23,9 +157,21 @@ def load_key(key):
             value = value[k]
         else:
             raise KeyError(f"Key '{k}' not found in configuration")
+    # hand out copies of containers so callers can never mutate the shared snapshot
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
     return value
 
 def update_key(key, new_value):
+    layers = _overlays.get()
+    if layers:
+        # inside a job overlay: keep the change local to this job
+        _parent_of(_get_snapshot(), key)
+        with lock:
+            layers[-1][key] = new_value
+            _count("writes")
+        return True
+
     with lock:
         with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
             data = yaml.load(file)
@@ -42,10 +188,12 @@ def update_key(key, new_value):
             current[keys[-1]] = new_value
             with open(CONFIG_PATH, 'w', encoding='utf-8') as file:
                 yaml.dump(data, file)
+            _set_snapshot(data, _file_stamp())
+            _count("writes")
             return True
         else:
             raise KeyError(f"Key '{keys[-1]}' not found in configuration")
-        
+
 # basic utils
 def get_joiner(language):
     if language in load_key('language_split_with_space'):
@@ -57,3 +205,4 @@ def get_joiner(language):
 
 if __name__ == "__main__":
     print(load_key('language_split_with_space'))
+    print(config_stats())
@@ -8,15 +8,60 @@ import logging
 import requests
 import json
 import time
+import threading
 from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
 from core.utils.token_utils import get_github_access_token
+from core.utils.config_utils import load_key
 
 logger = logging.getLogger(__name__)
 
+COPILOT_TOKEN_URL = "https://api.github.com/copilot_internal/v2/token"
+COPILOT_CHAT_URL = "https://api.githubcopilot.com/chat/completions"
+TOKEN_REFRESH_MARGIN = 120  # refresh the Copilot token this many seconds before it expires
+DEFAULT_TOKEN_TTL = 1500  # used when the token response carries no expires_at
+MAX_RETRIES = 4
+
+class CopilotRequestError(Exception):
+    """A chat request that still failed after the client's own MAX_RETRIES"""
+
+class TokenBucket:
+    """Thread-safe token bucket, can be paused when the server asks us to back off"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available, return the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
 class WorkingCopilotAPIClient:
     """
     CONFIRMED WORKING GitHub Copilot API client
     Based on successful verify_token implementation from Get_access_token.py
+    Shares one pooled requests.Session across threads, refreshes the Copilot token
+    before it expires and rate limits requests with 429/Retry-After awareness
     """
     
     def __init__(self):
@@ -24,6 +69,18 @@ class WorkingCopilotAPIClient:
         self.timeout = 30
         self.access_token = None
         self.copilot_token = None
+        self.token_expires_at = 0
+        self.token_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "succeeded": 0, "retries": 0, "throttled": 0, "token_refreshes": 0,
+                      "total_latency": 0.0, "max_latency": 0.0, "rate_wait": 0.0}
+
+        max_in_flight = load_key("copilot.max_in_flight")
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.bucket = TokenBucket(rate=load_key("copilot.rate_limit"), capacity=max_in_flight)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_in_flight)
+        self.session.mount("https://", adapter)
         self._initialize()
     
     def _initialize(self):
@@ -36,7 +93,7 @@ class WorkingCopilotAPIClient:
             logger.info(f"GitHub token loaded: {self.access_token[:10]}...")
             
             # Get Copilot token using CONFIRMED WORKING method
-            self.copilot_token = self._get_copilot_token_working_method()
+            self._refresh_token()
             
             if self.copilot_token:
                 logger.info("✅ Copilot token obtained successfully")
@@ -47,13 +104,11 @@ class WorkingCopilotAPIClient:
             logger.error(f"❌ Initialization failed: {e}")
             raise
     
-    def _get_copilot_token_working_method(self) -> str:
+    def _get_copilot_token_working_method(self) -> Dict:
         """
         Get Copilot token using EXACT method from successful Get_access_token.py
         This is the CONFIRMED WORKING implementation
         """
-        url = "https://api.github.com/copilot_internal/v2/token"
-        
         # EXACT headers from working implementation
         headers = {
             "Authorization": f"token {self.access_token}",
@@ -61,34 +116,53 @@ class WorkingCopilotAPIClient:
         }
         
         # Use GET method as confirmed working
-        response = requests.get(url, headers=headers, timeout=30)
+        response = self.session.get(COPILOT_TOKEN_URL, headers=headers, timeout=30)
         
         if response.status_code == 200:
-            return response.json()["token"]
+            return response.json()
         else:
             raise Exception(f"Failed to get Copilot token: {response.status_code} - {response.text}")
-    
+
+    def _refresh_token(self):
+        data = self._get_copilot_token_working_method()
+        self.copilot_token = data["token"]
+        self.token_expires_at = data.get("expires_at") or time.time() + DEFAULT_TOKEN_TTL
+        with self.stats_lock:
+            self.stats["token_refreshes"] += 1
+
+    def _ensure_token(self, force: bool = False) -> str:
+        """Return a valid Copilot token, refreshing it proactively before `expires_at`"""
+        with self.token_lock:
+            if force or not self.copilot_token or time.time() >= self.token_expires_at - TOKEN_REFRESH_MARGIN:
+                self._refresh_token()
+                if not self.copilot_token:
+                    raise ValueError("Copilot token not available")
+            return self.copilot_token
+
+    def _count(self, key: str, value: float = 1):
+        with self.stats_lock:
+            self.stats[key] += value
+
+    def get_stats(self) -> Dict:
+        """Snapshot of request counters, latency and throttling figures"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats["avg_latency"] = stats["total_latency"] / stats["succeeded"] if stats["succeeded"] else 0.0
+        return stats
+
+    @staticmethod
+    def _retry_after(response) -> float:
+        value = response.headers.get("Retry-After")
+        try:
+            return max(float(value), 1.0)
+        except (TypeError, ValueError):
+            return 0.0
+
     def chat_completion(self, messages: list, model: str = None, response_format: Dict = None, **kwargs) -> Dict:
         """
         Make chat completion using CONFIRMED WORKING method
         Exact implementation from successful verify_token test
         """
-        if not self.copilot_token:
-            # Try to refresh token
-            self.copilot_token = self._get_copilot_token_working_method()
-            if not self.copilot_token:
-                raise ValueError("Copilot token not available")
-        
-        # EXACT headers from confirmed working test
-        headers = {
-            "Authorization": f"Bearer {self.copilot_token}",
-            "User-Agent": "GitHub-Copilot-Client/1.0",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Editor-Version": "vscode/1.85.0",
-            "Editor-Plugin-Version": "copilot/1.155.0"
-        }
-        
         # EXACT data structure from working implementation
         data = {
             "model": model or self.model,
@@ -103,33 +177,63 @@ class WorkingCopilotAPIClient:
         # Add response format if specified (for JSON responses)
         if response_format:
             data["response_format"] = response_format
-        
-        # EXACT API URL from working test
-        api_url = "https://api.githubcopilot.com/chat/completions"
-        
-        try:
-            logger.info("🚀 Sending Copilot API request...")
-            
-            response = requests.post(
-                api_url,
-                json=data,
-                headers=headers,
-                timeout=self.timeout
-            )
-            
+
+        timeout = kwargs.get("timeout", self.timeout)
+        self._count("requests")
+        force_refresh = False
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt > 0:
+                self._count("retries")
+            token = self._ensure_token(force=force_refresh)
+            force_refresh = False
+
+            # EXACT headers from confirmed working test
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "User-Agent": "GitHub-Copilot-Client/1.0",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Editor-Version": "vscode/1.85.0",
+                "Editor-Plugin-Version": "copilot/1.155.0"
+            }
+
+            self._count("rate_wait", self.bucket.acquire())
+            try:
+                with self.in_flight:
+                    logger.info("🚀 Sending Copilot API request...")
+                    start = time.monotonic()
+                    response = self.session.post(COPILOT_CHAT_URL, json=data, headers=headers, timeout=timeout)
+                    latency = time.monotonic() - start
+            except requests.exceptions.RequestException as e:
+                error_msg = f"Network error during Copilot API request: {e}"
+                logger.error(f"❌ {error_msg}")
+                if attempt == MAX_RETRIES:
+                    raise CopilotRequestError(error_msg)
+                time.sleep(2 ** attempt)
+                continue
+
             if response.status_code == 200:
                 result = response.json()
+                with self.stats_lock:
+                    self.stats["succeeded"] += 1
+                    self.stats["total_latency"] += latency
+                    self.stats["max_latency"] = max(self.stats["max_latency"], latency)
                 logger.info("✅ Copilot API request successful")
                 return result
-            else:
-                error_msg = f"Copilot API error: {response.status_code} - {response.text}"
-                logger.error(f"❌ {error_msg}")
-                raise Exception(error_msg)
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Network error during Copilot API request: {e}"
+
+            error_msg = f"Copilot API error: {response.status_code} - {response.text}"
+            if attempt < MAX_RETRIES and response.status_code in (429, 502, 503, 504):
+                # back off globally so the other threads stop hammering the endpoint too
+                delay = self._retry_after(response) or 2 ** attempt
+                self._count("throttled")
+                logger.warning(f"⏳ {error_msg}, backing off {delay:.1f}s")
+                self.bucket.pause(delay)
+                continue
+            if attempt < MAX_RETRIES and response.status_code == 401:
+                force_refresh = True
+                continue
             logger.error(f"❌ {error_msg}")
-            raise Exception(error_msg)
+            raise CopilotRequestError(error_msg)
     
     def test_connection(self) -> bool:
         """Test connection using confirmed working method"""
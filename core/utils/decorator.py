@@ -7,7 +7,8 @@ from rich import print as rprint
 # retry decorator
 # ------------------------------
 
-def except_handler(error_msg, retry=0, delay=1, default_return=None):
+def except_handler(error_msg, retry=0, delay=1, default_return=None, no_retry=()):
+    """`no_retry`: exception types that were already retried further down and fail at once"""
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
@@ -18,7 +19,7 @@ def except_handler(error_msg, retry=0, delay=1, default_return=None):
                 except Exception as e:
                     last_exception = e
                     rprint(f"[red]{error_msg}: {e}, retry: {i+1}/{retry}[/red]")
-                    if i == retry:
+                    if i == retry or isinstance(e, no_retry):
                         if default_return is not None:
                             return default_return
                         raise last_exception
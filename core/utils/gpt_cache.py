@@ -0,0 +1,195 @@
+import os
+import glob
+import json
+import time
+import sqlite3
+import hashlib
+from threading import Lock
+
+# ------------
+# content-addressed gpt response cache (sqlite, WAL)
+# ------------
+
+GPT_LOG_FOLDER = 'output/gpt_log'
+CACHE_DB = os.path.join(GPT_LOG_FOLDER, 'cache.db')
+EVICT_CHECK_EVERY = 64
+TOUCH_INTERVAL = 600    # a hit refreshes `accessed` only if the stored value is older than this (seconds)
+TOUCH_FLUSH_EVERY = 64  # pending refreshes are written in one transaction
+SCHEMA_VERSION = 1      # PRAGMA user_version; 0 means the legacy json logs were not imported yet
+
+LOCK = Lock()
+_conn = None
+_puts = 0
+_touched = {}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    prompt TEXT,
+    resp_content TEXT,
+    resp_type TEXT,
+    resp TEXT,
+    message TEXT,
+    log_title TEXT,
+    is_error INTEGER DEFAULT 0,
+    size INTEGER,
+    created REAL,
+    accessed REAL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed);
+CREATE INDEX IF NOT EXISTS idx_responses_log_title ON responses(log_title);
+"""
+
+def cache_key(model, prompt, resp_type):
+    raw = json.dumps([model, prompt, resp_type], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def _get_conn():
+    """Open (or reopen after the output folder was moved away) the shared connection. Call with LOCK held."""
+    global _conn
+    if _conn is not None and not os.path.exists(CACHE_DB):
+        _conn.close()
+        _conn = None
+    if _conn is None:
+        os.makedirs(GPT_LOG_FOLDER, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_DB, timeout=30, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(_SCHEMA)
+        if _conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _import_legacy_logs(_conn)
+    return _conn
+
+def _import_legacy_logs(conn):
+    """One-time import of the `<log_title>.json` lists the cache used to live in, so old runs stay cached"""
+    now = time.time()
+    rows = []
+    for file in sorted(glob.glob(os.path.join(GPT_LOG_FOLDER, '*.json'))):
+        log_title = os.path.splitext(os.path.basename(file))[0]
+        try:
+            with open(file, 'r', encoding='utf-8') as f:
+                logs = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(logs, list):
+            continue
+        for n, item in enumerate(logs):
+            try:
+                model, prompt, resp_type = item["model"], item["prompt"], item["resp_type"]
+                resp_content, message = item.get("resp_content"), item.get("message")
+                resp_json = json.dumps(item["resp"], ensure_ascii=False)
+            except (TypeError, KeyError):
+                continue
+            key = cache_key(model, prompt, resp_type)
+            if message is not None:
+                key = f"error:{key}:legacy:{log_title}:{n}"
+            size = len(prompt) + len(resp_content or "") + len(resp_json)
+            rows.append((key, model, prompt, resp_content, resp_type, resp_json, message, log_title,
+                         int(message is not None), size, now, now))
+    # the old lookup returned the first match in a file, so the first entry of a key wins
+    conn.executemany("INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+def _flush_touched(conn):
+    """Write pending `accessed` refreshes. Call with LOCK held; the caller commits."""
+    if _touched:
+        conn.executemany("UPDATE responses SET accessed = ? WHERE key = ?", [(t, k) for k, t in _touched.items()])
+        _touched.clear()
+
+def close_cache():
+    """Release the db handle, e.g. before `cleanup` moves output/gpt_log"""
+    global _conn
+    with LOCK:
+        if _conn is not None:
+            _flush_touched(_conn)
+            _conn.commit()
+            _conn.close()
+            _conn = None
+
+def load_cache(model, prompt, resp_type):
+    key = cache_key(model, prompt, resp_type)
+    with LOCK:
+        conn = _get_conn()
+        row = conn.execute("SELECT resp, accessed FROM responses WHERE key = ? AND is_error = 0", (key,)).fetchone()
+        if row is None:
+            return False
+        # a hit is a read: LRU order only needs `accessed` to be roughly right, so recent entries are left
+        # alone and stale ones are refreshed in batches instead of one write transaction per hit
+        now = time.time()
+        if now - (row[1] or 0) >= TOUCH_INTERVAL:
+            _touched[key] = now
+            if len(_touched) >= TOUCH_FLUSH_EVERY:
+                _flush_touched(conn)
+                conn.commit()
+    return json.loads(row[0])
+
+def save_cache(model, prompt, resp_content, resp_type, resp, message=None, log_title="default"):
+    global _puts
+    is_error = 1 if message is not None else 0
+    # error entries are kept for inspection only and must never be served as a hit
+    key = cache_key(model, prompt, resp_type)
+    if is_error:
+        key = f"error:{key}:{time.time_ns()}"
+    resp_json = json.dumps(resp, ensure_ascii=False)
+    size = len(prompt) + len(resp_content or "") + len(resp_json)
+    now = time.time()
+    with LOCK:
+        conn = _get_conn()
+        _flush_touched(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, model, prompt, resp_content, resp_type, resp_json, message, log_title, is_error, size, now, now)
+        )
+        conn.commit()
+        _puts += 1
+        if _puts % EVICT_CHECK_EVERY == 0:
+            _evict(conn)
+
+def _evict(conn):
+    """Drop least recently used entries until the cache fits in `gpt_cache_max_mb`"""
+    from core.utils.config_utils import load_key
+    max_bytes = load_key("gpt_cache_max_mb") * 1024 * 1024
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+    freed = 0
+    victims = []
+    for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+        if total - freed <= max_bytes:
+            break
+        victims.append((key,))
+        freed += size
+    conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+    conn.commit()
+
+# ------------
+# export human-readable logs
+# ------------
+
+def export_logs(log_title=None):
+    """Write `output/gpt_log/<log_title>.json` in the classic list format, for one title or all of them"""
+    with LOCK:
+        conn = _get_conn()
+        if log_title is None:
+            titles = [r[0] for r in conn.execute("SELECT DISTINCT log_title FROM responses")]
+        else:
+            titles = [log_title]
+        exported = []
+        for title in titles:
+            rows = conn.execute(
+                "SELECT model, prompt, resp_content, resp_type, resp, message FROM responses WHERE log_title = ? ORDER BY created",
+                (title,)
+            ).fetchall()
+            logs = [{"model": m, "prompt": p, "resp_content": rc, "resp_type": rt, "resp": json.loads(r), "message": msg}
+                    for m, p, rc, rt, r, msg in rows]
+            file = os.path.join(GPT_LOG_FOLDER, f"{title}.json")
+            with open(file, 'w', encoding='utf-8') as f:
+                json.dump(logs, f, ensure_ascii=False, indent=4)
+            exported.append(file)
+    return exported
+
+if __name__ == '__main__':
+    for f in export_logs():
+        print(f"✅ Exported: {f}")
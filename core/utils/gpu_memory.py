@@ -0,0 +1,40 @@
+import gc
+import sys
+from rich import print as rprint
+
+# ------------
+# release hooks for models cached in this process
+# ------------
+
+_release_hooks = []
+
+def register_release_hook(hook):
+    """Register a callable that drops a process-wide model cache"""
+    if hook not in _release_hooks:
+        _release_hooks.append(hook)
+
+def _free_gpu_gb():
+    """Free memory on the current CUDA device in GB, None when there is no CUDA device to ask"""
+    # only touch torch if a backend already imported it
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    free, _ = torch.cuda.mem_get_info()
+    return free / (1024 ** 3)
+
+def release_gpu_memory(reason="", needed_gb=4.0):
+    """Drop every registered model cache when the next stage (Demucs, TTS) would not fit next to them.
+
+    Models stay loaded, and reusable by the next batch task, whenever the device still has `needed_gb` free;
+    without a CUDA device there is no GPU memory to reclaim.
+    """
+    if not _release_hooks:
+        return
+    free_gb = _free_gpu_gb()
+    if free_gb is None or free_gb >= needed_gb:
+        return
+    rprint(f"[cyan]🧹 Releasing cached models {reason} ({free_gb:.1f} GB free)[/cyan]")
+    for hook in _release_hooks:
+        hook()
+    gc.collect()
+    sys.modules["torch"].cuda.empty_cache()
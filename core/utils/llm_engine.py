@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rich import print as rprint
+from core.utils.config_utils import load_key, current_overlays, use_overlays, in_job_context
+from core.utils.ask_gpt import ask_gpt, lookup_cache, current_provider
+
+# ------------
+# priorities, lower runs first
+# ------------
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# ------------
+# priority gate & per-provider rate limit
+# ------------
+
+class PriorityGate:
+    """Async semaphore that admits waiters by (priority, arrival order)"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.waiters = []
+        self.counter = itertools.count()
+
+    async def acquire(self, priority):
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self.waiters:
+            _, _, fut = heapq.heappop(self.waiters)
+            if not fut.done():
+                # hand the slot straight to the next waiter
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+class AsyncRateLimiter:
+    """Token bucket shared by every request going to one provider"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# ------------
+# shared scheduler running on a background event loop
+# ------------
+
+class LLMScheduler:
+    def __init__(self, max_concurrency, provider_rate_limit, max_threads=64):
+        self.gate = PriorityGate(max_concurrency)
+        self.provider_rate_limit = provider_rate_limit
+        self.limiters = {}
+        # blocking http clients run here. The pool only bounds threads, which are started on demand;
+        # how many requests are in flight is the gate's decision, so it never shrinks below the gate.
+        self.executor = ThreadPoolExecutor(max_workers=max(max_threads, max_concurrency), thread_name_prefix="llm")
+        self.stats = {"submitted": 0, "cache_hits": 0, "completed": 0, "failed": 0}
+
+    def _limiter(self, provider):
+        if provider not in self.limiters:
+            self.limiters[provider] = AsyncRateLimiter(self.provider_rate_limit)
+        return self.limiters[provider]
+
+    async def ask(self, prompt, resp_type=None, valid_def=None, log_title="default", priority=PRIORITY_NORMAL, bypass_cache=False):
+        self.stats["submitted"] += 1
+        loop = asyncio.get_running_loop()
+        # sqlite lookups block, keep them off the engine loop
+        cached = None if bypass_cache else await asyncio.to_thread(lookup_cache, prompt, resp_type)
+        if cached:
+            self.stats["cache_hits"] += 1
+            rprint("use cache response")
+            return cached
+
+        await self.gate.acquire(priority)
+        try:
+            # run_in_executor does not carry the task's context over, bind the job config explicitly
+            provider = await loop.run_in_executor(self.executor, in_job_context(current_provider))
+            await self._limiter(provider).acquire()
+            result = await loop.run_in_executor(self.executor, in_job_context(lambda: ask_gpt(prompt, resp_type=resp_type, valid_def=valid_def, log_title=log_title, bypass_cache=bypass_cache)))
+            self.stats["completed"] += 1
+            return result
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.gate.release()
+
+_loop = None
+_scheduler = None
+_init_lock = threading.Lock()
+
+def _get_loop():
+    global _loop, _scheduler
+    with _init_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-engine", daemon=True).start()
+            _scheduler = LLMScheduler(load_key("llm_engine.max_concurrency"), load_key("llm_engine.provider_rate_limit"),
+                                      load_key("llm_engine.max_threads"))
+    return _loop
+
+def get_scheduler():
+    _get_loop()
+    return _scheduler
+
+async def ask_gpt_async(prompt, resp_type=None, valid_def=None, log_title="default", priority=PRIORITY_NORMAL, bypass_cache=False):
+    """Awaitable ask_gpt: cache hits return at once, misses wait for a slot on the shared scheduler"""
+    return await get_scheduler().ask(prompt, resp_type=resp_type, valid_def=valid_def, log_title=log_title, priority=priority, bypass_cache=bypass_cache)
+
+# ------------
+# sync entry points for pipeline stages
+# ------------
+
+async def _in_overlays(coro, layers):
+    # the engine loop lives on its own thread; tasks and to_thread calls below inherit what is set here
+    with use_overlays(layers):
+        return await coro
+
+def run_sync(coro):
+    """Run one coroutine on the engine loop, with the caller's job config, and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(_in_overlays(coro, current_overlays()), _get_loop()).result()
+
+def run_tasks(coros, on_done=None, return_exceptions=False):
+    """Run coroutines concurrently on the engine loop, return their results in submission order"""
+    async def _wrap(coro):
+        try:
+            return await coro
+        finally:
+            if on_done:
+                on_done()
+
+    async def _gather():
+        tasks = [asyncio.ensure_future(_wrap(c)) for c in coros]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            # the first failure is re-raised: do not leave its siblings running on the background loop
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    return run_sync(_gather())
@@ -1,6 +1,8 @@
 import os
 import glob
 from core._1_ytdlp import find_video_files
+from core.utils.gpt_cache import export_logs, close_cache
+from core.asr_backend.audio_source import release_sources, PCM_CACHE_DIR
 import shutil
 
 def cleanup(history_dir="history"):
@@ -18,6 +20,10 @@ def cleanup(history_dir="history"):
     os.makedirs(log_dir, exist_ok=True)
     os.makedirs(gpt_log_dir, exist_ok=True)
 
+    # Drop decoded PCM caches, they are cheap to rebuild and large to archive
+    release_sources()
+    shutil.rmtree(PCM_CACHE_DIR, ignore_errors=True)
+
     # Move non-log files
     for file in glob.glob("output/*"):
         if not file.endswith(('log', 'gpt_log')):
@@ -27,7 +33,10 @@ def cleanup(history_dir="history"):
     for file in glob.glob("output/log/*"):
         move_file(file, log_dir)
 
-    # Move gpt_log files
+    # Export readable gpt logs from the response cache, then move gpt_log files
+    if os.path.exists("output/gpt_log"):
+        export_logs()
+    close_cache()
     for file in glob.glob("output/gpt_log/*"):
         move_file(file, gpt_log_dir)
 
@@ -0,0 +1,85 @@
+import json
+import subprocess
+import time
+from typing import List, Optional, Tuple
+from rich import print as rprint
+
+# ------------
+# one decode, many outputs: plan a single ffmpeg run for every burned-in video
+# ------------
+
+def probe_video_size(video_file: str) -> Tuple[int, int]:
+    """(width, height) of the first video stream via ffprobe"""
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=width,height', '-of', 'json', video_file]
+    stream = json.loads(subprocess.run(cmd, capture_output=True, check=True).stdout)['streams'][0]
+    return int(stream['width']), int(stream['height'])
+
+def fit_filter(source_size: Tuple[int, int], target_size: Tuple[int, int]) -> str:
+    """scale+pad into target_size, or nothing when the source already has that size"""
+    if source_size == target_size:
+        return ""
+    w, h = target_size
+    return f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"
+
+class RenderTarget:
+    """One output file: the video filter applied after the shared decode, plus where its audio comes from.
+
+    `audio_filter` may reference extra inputs as {0}, {1}, ... in the order of `audio_inputs`;
+    without a filter the source audio is passed to the encoder.
+    """
+
+    def __init__(self, output: str, video_filter: str = "", audio_inputs: Optional[List[str]] = None,
+                 audio_filter: str = "", audio_args: Optional[List[str]] = None):
+        self.output = output
+        self.video_filter = video_filter
+        self.audio_inputs = audio_inputs or []
+        self.audio_filter = audio_filter
+        self.audio_args = audio_args or []
+
+def build_render_cmd(video_file: str, targets: List[RenderTarget], target_size: Optional[Tuple[int, int]] = None, gpu: bool = False) -> List[str]:
+    source_size = probe_video_size(video_file)
+    rprint(f"[bold green]Video resolution: {source_size[0]}x{source_size[1]}[/bold green]")
+    fit = fit_filter(source_size, target_size or source_size)
+
+    inputs, graph = ['-i', video_file], []
+    if len(targets) == 1:
+        heads = ["[0:v]" + (fit + "," if fit else "")]
+    else:
+        graph.append("[0:v]" + (fit + "," if fit else "") + f"split={len(targets)}" + "".join(f"[s{i}]" for i in range(len(targets))))
+        heads = [f"[s{i}]" for i in range(len(targets))]
+
+    outputs, next_input = [], 1
+    for i, target in enumerate(targets):
+        graph.append(f"{heads[i]}{target.video_filter or 'null'}[v{i}]")
+        maps = ['-map', f'[v{i}]']
+        if target.audio_filter:
+            labels = [f"[{next_input + j}:a]" for j in range(len(target.audio_inputs))]
+            graph.append(target.audio_filter.format(*labels) + f"[a{i}]")
+            maps += ['-map', f'[a{i}]']
+        else:
+            maps += ['-map', '0:a?']
+        for audio_file in target.audio_inputs:
+            inputs += ['-i', audio_file]
+        next_input += len(target.audio_inputs)
+        outputs += maps + (['-c:v', 'h264_nvenc'] if gpu else []) + target.audio_args + [target.output]
+
+    return ['ffmpeg', '-y', *inputs, '-filter_complex', ';'.join(graph), *outputs]
+
+def render(video_file: str, targets: List[RenderTarget], target_size: Optional[Tuple[int, int]] = None, gpu: bool = False) -> None:
+    """Decode `video_file` once and encode every target from the shared frames; raises if ffmpeg fails"""
+    cmd = build_render_cmd(video_file, targets, target_size, gpu)
+    if gpu:
+        rprint("[bold green]will use GPU acceleration.[/bold green]")
+    rprint(f"🎬 Rendering {', '.join(t.output for t in targets)} ...")
+    start_time = time.time()
+    process = subprocess.Popen(cmd)
+    try:
+        process.wait()
+    except BaseException:
+        if process.poll() is None:
+            process.kill()
+        raise
+    if process.returncode != 0:
+        rprint("\n❌ FFmpeg execution error")
+        raise RuntimeError(f"ffmpeg failed to render {', '.join(t.output for t in targets)} (exit code {process.returncode})")
+    rprint(f"\n✅ Done! Time taken: {time.time() - start_time:.2f} seconds")
@@ -177,6 +177,8 @@ def check_log_files():
     
     log_dir = Path('output/gpt_log')
     if log_dir.exists():
+        from core.utils.gpt_cache import export_logs
+        export_logs()
         log_files = list(log_dir.glob('*.json'))
         if log_files:
             print(f"  ✅ 找到 {len(log_files)} 个日志文件")
@@ -0,0 +1,69 @@
+import importlib
+import pytest
+from core.utils.ask_gpt import ask_gpt, lookup_cache
+
+# `core.utils.ask_gpt` is shadowed by the function of the same name re-exported from core.utils
+ask_gpt_module = importlib.import_module("core.utils.ask_gpt")
+
+CONFIG = {"api.model": "deepseek-chat", "api.key": "", "api.base_url": "https://api.example.com"}
+
+class FakeCopilot:
+    def __init__(self, content):
+        self.content, self.calls = content, 0
+
+    def chat_completion(self, **params):
+        self.calls += 1
+        return {"choices": [{"message": {"content": self.content}}]}
+
+@pytest.fixture
+def env(monkeypatch):
+    cache = {}
+    clients = []
+
+    def get_client():
+        clients.append(FakeCopilot('{"answer": "fresh"}'))
+        return clients[-1]
+
+    monkeypatch.setattr(ask_gpt_module, "load_key", CONFIG.__getitem__)
+    monkeypatch.setattr(ask_gpt_module, "load_cache", lambda model, prompt, resp_type: cache.get((model, prompt, resp_type), False))
+    monkeypatch.setattr(ask_gpt_module, "save_cache",
+                        lambda model, prompt, resp_content, resp_type, resp, message=None, log_title="default":
+                        cache.__setitem__((model, prompt, resp_type), resp) if message is None else None)
+    monkeypatch.setattr(ask_gpt_module, "_get_copilot_client", get_client)
+    return cache, clients
+
+def test_cache_hit_never_creates_a_client(env):
+    cache, clients = env
+    cache[("deepseek-chat", "p", "json")] = {"answer": "cached"}
+    # an answer from the configured api model is found even though copilot would be tried first
+    assert lookup_cache("p", "json") == {"answer": "cached"}
+    assert ask_gpt("p", resp_type="json") == {"answer": "cached"}
+    assert clients == []
+
+def test_miss_and_bypass_ask_the_provider(env):
+    cache, clients = env
+    assert ask_gpt("p", resp_type="json") == {"answer": "fresh"}
+    assert cache[(ask_gpt_module.COPILOT_MODEL, "p", "json")] == {"answer": "fresh"}
+    assert len(clients) == 1
+    ask_gpt("p", resp_type="json")
+    assert len(clients) == 1
+    ask_gpt("p", resp_type="json", bypass_cache=True)
+    assert len(clients) == 2
+
+def test_copilot_failure_is_not_retried_until_backoff(monkeypatch):
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise RuntimeError("no token")
+
+    monkeypatch.setattr(ask_gpt_module, "get_working_copilot_client", failing)
+    monkeypatch.setattr(ask_gpt_module, "_copilot_failed_at", None)
+    clock = [1000.0]
+    monkeypatch.setattr(ask_gpt_module.time, "time", lambda: clock[0])
+    assert ask_gpt_module._get_copilot_client() is None
+    assert ask_gpt_module._get_copilot_client() is None
+    assert len(attempts) == 1
+    clock[0] += ask_gpt_module.COPILOT_RETRY_AFTER
+    assert ask_gpt_module._get_copilot_client() is None
+    assert len(attempts) == 2
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from core.asr_backend import audio_preprocess
+from core.asr_backend.audio_preprocess import split_audio
+from core.asr_backend.energy_profile import EnergyProfile
+
+def _profile(duration, silences):
+    """-10 dB everywhere except the given (start, end) silent spans, in 10 ms frames"""
+    frame_db = np.full(int(duration * 100), -10.0, dtype=np.float32)
+    for start, end in silences:
+        frame_db[int(start * 100):int(end * 100)] = -90.0
+    return EnergyProfile(frame_db, -10.0, -3.0, duration)
+
+@pytest.fixture
+def profile(monkeypatch):
+    def use(duration, silences):
+        monkeypatch.setattr(audio_preprocess, "get_profile", lambda audio_file: _profile(duration, silences))
+    return use
+
+def test_short_audio_is_one_segment(profile):
+    profile(11.0, [])
+    assert split_audio("a.wav", target_len=10, win=2) == [(0, 11.0)]
+
+def test_cuts_half_a_second_into_the_first_silence_after_target(profile):
+    # the silence before the target and the one too short to hold both margins are skipped
+    profile(25.0, [(8.5, 9.7), (10.2, 10.8), (11.0, 12.5)])
+    assert split_audio("a.wav", target_len=10, win=2) == pytest.approx([(0, 11.5), (11.5, 21.5), (21.5, 25.0)])
+
+def test_falls_back_to_target_without_silence(profile):
+    profile(25.0, [])
+    assert split_audio("a.wav", target_len=10, win=2) == [(0, 10.0), (10.0, 20.0), (20.0, 25.0)]
@@ -0,0 +1,68 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from core.utils import config_utils
+from core.utils.config_utils import load_key, update_key, config_overlay, in_job_context
+
+CONFIG = """\
+target_language: 'English'
+whisper:
+  language: 'en'
+  detected_language: 'en'
+language_split_with_space: ['en', 'fr']
+"""
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG, encoding='utf-8')
+    monkeypatch.setattr(config_utils, "CONFIG_PATH", str(path))
+    monkeypatch.setattr(config_utils, "_snapshot", None)
+    monkeypatch.setattr(config_utils, "_snapshot_stamp", None)
+    return path
+
+def test_reload_only_when_file_changes(config):
+    assert load_key("whisper.language") == 'en'
+    reloads = config_utils.config_stats()["reloads"]
+    load_key("target_language")
+    assert config_utils.config_stats()["reloads"] == reloads
+
+    config.write_text(CONFIG.replace("'English'", "'French (Canada)'"), encoding='utf-8')
+    st = os.stat(config)
+    os.utime(config, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_key("target_language") == 'French (Canada)'
+    assert config_utils.config_stats()["reloads"] == reloads + 1
+
+def test_containers_are_copies(config):
+    load_key("language_split_with_space").append('xx')
+    assert load_key("language_split_with_space") == ['en', 'fr']
+
+def test_update_key_writes_file_and_snapshot(config):
+    assert update_key("whisper.language", 'fr')
+    assert load_key("whisper.language") == 'fr'
+    assert "language: 'fr'" in config.read_text(encoding='utf-8')
+    with pytest.raises(KeyError):
+        update_key("whisper.missing", 1)
+
+def test_overlay_is_local_to_its_context(config):
+    with config_overlay({"whisper.language": 'ja'}):
+        assert load_key("whisper.language") == 'ja'
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # a plain worker thread does not see the job's layer, a bound one does
+            assert executor.submit(load_key, "whisper.language").result() == 'en'
+            assert executor.submit(in_job_context(load_key), "whisper.language").result() == 'ja'
+    assert load_key("whisper.language") == 'en'
+
+def test_update_key_inside_overlay_leaves_file_alone(config):
+    before = config.read_text(encoding='utf-8')
+    with config_overlay() as layer:
+        update_key("whisper.detected_language", 'de')
+        assert load_key("whisper.detected_language") == 'de'
+        assert layer == {"whisper.detected_language": 'de'}
+    assert load_key("whisper.detected_language") == 'en'
+    assert config.read_text(encoding='utf-8') == before
+
+def test_overlay_rejects_unknown_keys(config):
+    with pytest.raises(KeyError):
+        with config_overlay({"whisper.nope": 1}):
+            pass
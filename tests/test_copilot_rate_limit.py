@@ -0,0 +1,44 @@
+import pytest
+from core.utils import copilot_api_working
+from core.utils.copilot_api_working import TokenBucket
+
+class FakeClock:
+    """Stands in for the module's `time`: sleeping just advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(copilot_api_working, "time", clock)
+    return clock
+
+def test_burst_up_to_capacity_then_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+
+def test_refill_is_capped(clock):
+    bucket = TokenBucket(rate=4, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.25)
+
+def test_pause_blocks_until_retry_after(clock):
+    bucket = TokenBucket(rate=8, capacity=5)
+    bucket.pause(3)
+    assert bucket.acquire() == pytest.approx(3)
+    # a shorter pause never cuts an active one short
+    bucket.pause(5)
+    bucket.pause(1)
+    assert bucket.acquire() == pytest.approx(5)
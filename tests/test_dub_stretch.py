@@ -0,0 +1,57 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from core.utils.models import _AUDIO_TMP_DIR, _AUDIO_SEGS_DIR
+from core.tts_backend.dub_stretch import TEMP_FILE_TEMPLATE, OUTPUT_FILE_TEMPLATE, parse_df_srt_time, process_chunk, process_dub_chunk
+from core.tts_backend.time_stretch import read_audio, write_wav
+
+SR = 16000
+
+@pytest.fixture
+def chunk(tmp_path, monkeypatch):
+    """Two dubbed rows of 1 s each in a 2.5 s slot (plus 0.2 s tolerance), written where _10 leaves them"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(_AUDIO_TMP_DIR)
+    os.makedirs(_AUDIO_SEGS_DIR)
+    t = np.arange(SR) / SR
+    for number in (1, 2):
+        write_wav(TEMP_FILE_TEMPLATE.format(f"{number}_0"), (0.3 * np.sin(2 * np.pi * 200 * t))[:, None], SR)
+    return pd.DataFrame({
+        'number': [1, 2],
+        'lines': ["['first line']", "['second line']"],
+        'start_time': ['00:00:00.000', '00:00:01.500'],
+        'end_time': ['00:00:01.000', '00:00:02.500'],
+        'tolerance': [0.5, 0.2],
+        'real_dur': [1.0, 1.0],
+        'tol_dur': [1.5, 1.2],
+        'gap': [0.5, 0.0],
+    })
+
+def test_parse_df_srt_time():
+    assert parse_df_srt_time('01:02:03.450') == pytest.approx(3723.45)
+    assert parse_df_srt_time(' 00:00:00.007 ') == pytest.approx(0.007)
+
+def test_process_chunk_picks_slowest_speed_that_fits(chunk):
+    speed_factor, keep_gaps = process_chunk(chunk, accept=1.2, min_speed=1.0)
+    assert keep_gaps
+    # lines plus the inner gap (2.5 s) fill the 2.5 s slot minus the 0.1 s safety margin
+    assert speed_factor == pytest.approx(round(2.5 / 2.4, 3))
+
+def test_dub_chunk_timeline_matches_written_audio(chunk):
+    speed_factor, sub_times = process_dub_chunk(chunk, 1.2, 1.0, "0 to 1")
+    assert len(sub_times) == 2 and all(len(times) == 1 for times in sub_times)
+    (s1, e1), (s2, e2) = sub_times[0][0], sub_times[1][0]
+    assert s1 == 0.0
+    assert s2 == pytest.approx(e1 + 0.5 / speed_factor)
+    for number, (start, end) in ((1, (s1, e1)), (2, (s2, e2))):
+        samples, sr = read_audio(OUTPUT_FILE_TEMPLATE.format(f"{number}_0"))
+        assert len(samples) / sr == pytest.approx(end - start)
+
+def test_dub_chunk_runs_in_a_spawned_worker(chunk):
+    expected = process_dub_chunk(chunk, 1.2, 1.0, "0 to 1")
+    # spawn, as on Windows and macOS: the worker re-imports only the light dub_stretch module
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert executor.submit(process_dub_chunk, chunk, 1.2, 1.0, "0 to 1").result() == expected
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from core.asr_backend import energy_profile
+from core.asr_backend.energy_profile import EnergyProfile, profile_from_samples, get_profile
+
+SR = 16000
+
+def _signal(spans):
+    """Concatenate (seconds, amplitude) spans of a 440 Hz tone; amplitude 0 is digital silence"""
+    parts = []
+    for seconds, amplitude in spans:
+        t = np.arange(int(seconds * SR)) / SR
+        parts.append(amplitude * np.sin(2 * np.pi * 440 * t))
+    return np.concatenate(parts)[:, None].astype(np.float32)
+
+def test_loudness_of_a_sine():
+    profile = profile_from_samples(_signal([(1.0, 0.5)]), SR)
+    # rms of a sine is amplitude / sqrt(2)
+    assert profile.dbfs == pytest.approx(20 * np.log10(0.5 / np.sqrt(2)), abs=0.01)
+    assert profile.peak_db == pytest.approx(20 * np.log10(0.5), abs=0.01)
+    assert profile.duration == pytest.approx(1.0)
+    assert len(profile.frame_db) == 100
+
+def test_partial_last_frame_counts_only_real_samples():
+    samples = np.full((SR // 100 * 3 + 40, 2), 0.25, dtype=np.float32)
+    profile = profile_from_samples(samples, SR)
+    assert len(profile.frame_db) == 4
+    assert profile.frame_db[-1] == pytest.approx(profile.frame_db[0], abs=1e-4)
+    assert profile.duration == pytest.approx(len(samples) / SR)
+
+def test_silence_regions_match_pydub():
+    pydub = pytest.importorskip("pydub")
+    from pydub.silence import detect_silence
+
+    samples = _signal([(1.0, 0.5), (0.8, 0.001), (0.5, 0.5), (0.3, 0.0), (0.4, 0.5), (1.2, 0.0)])
+    profile = profile_from_samples(samples, SR)
+    regions = profile.silence_regions(silence_thresh=-30, min_silence_len=0.25)
+
+    pcm = (samples[:, 0] * 32767).astype(np.int16)
+    segment = pydub.AudioSegment(pcm.tobytes(), frame_rate=SR, sample_width=2, channels=1)
+    expected = [(s / 1000, e / 1000) for s, e in detect_silence(segment, min_silence_len=250, silence_thresh=-30, seek_step=10)]
+    assert len(regions) == len(expected) == 3
+    for (s, e), (es, ee) in zip(regions, expected):
+        assert s == pytest.approx(es, abs=0.011)
+        assert e == pytest.approx(ee, abs=0.011)
+
+def test_silence_window_and_queries():
+    profile = profile_from_samples(_signal([(1.0, 0.5), (1.0, 0.0), (1.0, 0.5)]), SR)
+    assert profile.silence_regions(min_silence_len=0.5) == [(1.0, 2.0)]
+    # a search window only sees what lies inside it
+    assert profile.silence_regions(min_silence_len=0.5, start=1.5, end=3.0) == [(1.5, 2.0)]
+    assert profile.silence_regions(min_silence_len=0.5, start=1.8, end=3.0) == []
+    assert profile.voice_spans(min_silence_len=0.5) == [(0.0, 1.0), (2.0, 3.0)]
+    assert profile.is_silent(1.1, 1.9) and not profile.is_silent(0.5, 1.5)
+
+def test_get_profile_is_keyed_by_file_version(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_compute(audio_file):
+        calls.append(audio_file)
+        return EnergyProfile(np.zeros(3, dtype=np.float32), -20.0, -6.0, 0.03)
+
+    monkeypatch.setattr(energy_profile, "_compute", fake_compute)
+    monkeypatch.setattr(energy_profile, "_profiles", {})
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"x" * 10)
+    assert get_profile(str(audio)).dbfs == -20.0
+    assert get_profile(str(audio)).dbfs == -20.0
+    # a new process reads the .energy.npz instead of decoding again
+    monkeypatch.setattr(energy_profile, "_profiles", {})
+    assert get_profile(str(audio)).duration == pytest.approx(0.03)
+    assert len(calls) == 1
+    audio.write_bytes(b"y" * 20)
+    get_profile(str(audio))
+    assert len(calls) == 2
@@ -0,0 +1,67 @@
+import json
+import os
+import pytest
+from core.utils import gpt_cache
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    folder = tmp_path / "gpt_log"
+    monkeypatch.setattr(gpt_cache, "GPT_LOG_FOLDER", str(folder))
+    monkeypatch.setattr(gpt_cache, "CACHE_DB", str(folder / "cache.db"))
+    monkeypatch.setattr(gpt_cache, "_conn", None)
+    monkeypatch.setattr(gpt_cache, "_touched", {})
+    yield gpt_cache
+    gpt_cache.close_cache()
+
+def _accessed(cache, key):
+    with cache.LOCK:
+        return cache._get_conn().execute("SELECT accessed FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+def test_hit_miss_and_errors_never_served(cache):
+    assert cache.load_cache("m", "p", "json") is False
+    cache.save_cache("m", "p", '{"a": 1}', "json", {"a": 1})
+    assert cache.load_cache("m", "p", "json") == {"a": 1}
+    assert cache.load_cache("other", "p", "json") is False
+    cache.save_cache("m", "q", "bad", "json", {}, message="invalid", log_title="error")
+    assert cache.load_cache("m", "q", "json") is False
+
+def test_recent_hit_does_not_write(cache):
+    cache.save_cache("m", "p", "r", None, "r")
+    key = cache.cache_key("m", "p", None)
+    before = _accessed(cache, key)
+    cache.load_cache("m", "p", None)
+    assert cache._touched == {}
+    assert _accessed(cache, key) == before
+
+def test_stale_hit_is_batched_until_flush(cache):
+    cache.save_cache("m", "p", "r", None, "r")
+    key = cache.cache_key("m", "p", None)
+    with cache.LOCK:
+        conn = cache._get_conn()
+        conn.execute("UPDATE responses SET accessed = 0 WHERE key = ?", (key,))
+        conn.commit()
+    cache.load_cache("m", "p", None)
+    assert key in cache._touched
+    assert _accessed(cache, key) == 0
+    cache.close_cache()
+    assert _accessed(cache, key) > 0
+
+def test_legacy_json_logs_are_imported_once(cache):
+    os.makedirs(cache.GPT_LOG_FOLDER)
+    legacy = [
+        {"model": "m", "prompt": "p", "resp_content": "first", "resp_type": None, "resp": "first", "message": None},
+        {"model": "m", "prompt": "p", "resp_content": "second", "resp_type": None, "resp": "second", "message": None},
+        {"model": "m", "prompt": "bad", "resp_content": "x", "resp_type": None, "resp": "x", "message": "invalid"},
+    ]
+    with open(os.path.join(cache.GPT_LOG_FOLDER, "translate.json"), "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+    assert cache.load_cache("m", "p", None) == "first"
+    assert cache.load_cache("m", "bad", None) is False
+
+    # a later export rewrites the json files; they must not be imported again
+    cache.save_cache("m", "p2", "new", None, "new", log_title="translate")
+    cache.export_logs()
+    cache.close_cache()
+    with cache.LOCK:
+        count = cache._get_conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    assert count == 3
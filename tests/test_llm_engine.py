@@ -0,0 +1,64 @@
+import asyncio
+import time
+from core.utils.llm_engine import PriorityGate, AsyncRateLimiter, run_tasks, PRIORITY_HIGH, PRIORITY_LOW
+
+def test_priority_gate_admits_by_priority_then_arrival():
+    async def scenario():
+        gate = PriorityGate(1)
+        order = []
+        await gate.acquire(PRIORITY_LOW)  # hold the only slot
+
+        async def worker(name, priority):
+            await gate.acquire(priority)
+            order.append(name)
+            gate.release()
+
+        tasks = [asyncio.create_task(worker("low-1", PRIORITY_LOW)),
+                 asyncio.create_task(worker("high", PRIORITY_HIGH)),
+                 asyncio.create_task(worker("low-2", PRIORITY_LOW))]
+        await asyncio.sleep(0)
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order, gate.active
+
+    order, active = asyncio.run(scenario())
+    assert order == ["high", "low-1", "low-2"]
+    assert active == 0
+
+def test_rate_limiter_spaces_requests():
+    async def scenario():
+        limiter = AsyncRateLimiter(20)
+        limiter.tokens = 0
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) >= 0.1
+
+def test_run_tasks_keeps_submission_order():
+    async def delayed(value, delay):
+        await asyncio.sleep(delay)
+        return value
+
+    assert run_tasks([delayed(1, 0.03), delayed(2, 0.0), delayed(3, 0.01)]) == [1, 2, 3]
+
+def test_run_tasks_cancels_siblings_after_first_failure():
+    finished = []
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def slow():
+        await asyncio.sleep(0.5)
+        finished.append(True)
+
+    try:
+        run_tasks([fail(), slow()])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the failure must propagate")
+    time.sleep(0.6)
+    assert finished == []
@@ -0,0 +1,39 @@
+import struct
+from core.asr_backend.media_info import _read_wav_header
+
+def _write_wav(path, audio_format=1, channels=2, sample_rate=16000, bits=16, frames=800,
+               data_size=None, extensible_subformat=None, extra_chunk=False):
+    block_align = channels * bits // 8
+    fmt = struct.pack('<HHIIHH', 0xFFFE if extensible_subformat else audio_format, channels, sample_rate,
+                      sample_rate * block_align, block_align, bits)
+    if extensible_subformat:
+        fmt += struct.pack('<HHI', 22, bits, 0) + struct.pack('<H', extensible_subformat) + b'\x00' * 14
+    data = b'\x00' * (frames * block_align)
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+    if extra_chunk:
+        body += b'LIST' + struct.pack('<I', 3) + b'abc\x00'  # odd size, padded
+    body += b'data' + struct.pack('<I', len(data) if data_size is None else data_size) + data
+    path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+    return str(path)
+
+def test_pcm_header(tmp_path):
+    info = _read_wav_header(_write_wav(tmp_path / "a.wav", extra_chunk=True))
+    assert info == {'duration': 0.05, 'sample_rate': 16000, 'channels': 2, 'frames': 800, 'bits_per_sample': 16}
+
+def test_float_and_extensible_pcm(tmp_path):
+    assert _read_wav_header(_write_wav(tmp_path / "f.wav", audio_format=3, bits=32))['frames'] == 800
+    assert _read_wav_header(_write_wav(tmp_path / "e.wav", extensible_subformat=1))['frames'] == 800
+
+def test_compressed_formats_go_to_ffprobe(tmp_path):
+    assert _read_wav_header(_write_wav(tmp_path / "u.wav", audio_format=7, bits=8)) is None      # mu-law
+    assert _read_wav_header(_write_wav(tmp_path / "ad.wav", audio_format=2, bits=4)) is None     # MS ADPCM
+    assert _read_wav_header(_write_wav(tmp_path / "ea.wav", extensible_subformat=0x55)) is None  # mp3 in extensible
+
+def test_streamed_size_uses_bytes_on_disk(tmp_path):
+    for size in (0, 0xFFFFFFFF):
+        assert _read_wav_header(_write_wav(tmp_path / "s.wav", data_size=size))['frames'] == 800
+
+def test_not_a_wav(tmp_path):
+    path = tmp_path / "x.wav"
+    path.write_bytes(b'ID3\x04' + b'\x00' * 64)
+    assert _read_wav_header(str(path)) is None
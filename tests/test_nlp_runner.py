@@ -0,0 +1,39 @@
+import pytest
+spacy = pytest.importorskip("spacy")
+from spacy.language import Language
+from core.spacy_utils import nlp_runner
+from core.spacy_utils.nlp_runner import run_pipe, parse, token_counts
+
+SEEN = []
+
+@Language.component("test_nlp_runner_probe")
+def probe(doc):
+    SEEN.append(doc.text)
+    return doc
+
+@pytest.fixture
+def nlp(monkeypatch):
+    monkeypatch.setattr(nlp_runner, "load_key", {"spacy_pipe.batch_size": 2, "spacy_pipe.n_process": 1}.__getitem__)
+    SEEN.clear()
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("test_nlp_runner_probe", name="ner")
+    return nlp
+
+def test_tokenize_stage_runs_no_component(nlp):
+    texts = ["one two", "three", "", "four five six."]
+    assert token_counts(texts, nlp) == [2, 1, 0, 4]
+    assert SEEN == []
+    # the tokenizer-only docs carry no sentence boundaries
+    assert not run_pipe(["a. b."], "tokenize", nlp)[0].has_annotation("SENT_START")
+
+def test_parse_stage_disables_only_unused_components(nlp):
+    doc = parse("First one. Second one.", nlp)
+    assert [sent.text for sent in doc.sents] == ["First one.", "Second one."]
+    assert SEEN == []  # "ner" is off while parsing
+    nlp("plain call")
+    assert SEEN == ["plain call"]
+
+def test_docs_come_back_in_order_across_batches(nlp):
+    texts = [f"text {i}" for i in range(7)]
+    assert [doc.text for doc in run_pipe(texts, "parse", nlp)] == texts
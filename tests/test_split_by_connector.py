@@ -0,0 +1,45 @@
+import random
+import pytest
+spacy = pytest.importorskip("spacy")
+from spacy.tokens import Doc
+from core.spacy_utils import split_by_connector
+from core.spacy_utils.split_by_connector import connector_split_points, split_range_by_connectors
+from core.spacy_utils.bench_split_by_connector import split_range_by_connectors_loop
+
+WORDS = ["we", "saw", "the", "team", "play", "well", "today", "and", "but", "because", "or", "when", "that", ",", ".", "'s"]
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    monkeypatch.setattr(split_by_connector, "rprint", lambda *args, **kwargs: None)
+
+@pytest.fixture(scope="module")
+def vocab():
+    return spacy.blank("en").vocab
+
+def test_one_pass_matches_rescan_loop(vocab):
+    rng = random.Random(0)
+    for _ in range(300):
+        doc = Doc(vocab, words=[rng.choice(WORDS) for _ in range(rng.randint(0, 60))])
+        start = rng.randint(0, len(doc))
+        end = rng.randint(start, len(doc))
+        for context_words in (2, 5):
+            assert split_range_by_connectors(doc, start, end, context_words) == \
+                [r for r in split_range_by_connectors_loop(doc, start, end, context_words) if r[0] < r[1]]
+
+def test_cuts_before_connectors_with_enough_context(vocab):
+    words = "we saw the team play well and they won the game easily today".split()
+    doc = Doc(vocab, words=words)
+    assert connector_split_points(doc, 0, len(doc)) == [words.index("and")]
+    # too little context on the right once the range ends early
+    assert connector_split_points(doc, 0, 9) == []
+
+def test_that_splits_only_as_a_clause_marker(vocab):
+    words = ["i", "really", "think", "now", "more", "than", "ever", "that", "we", "should", "go", "home", "now"]
+    heads = list(range(len(words)))
+    heads[7] = 10
+    pos = ["X"] * len(words)
+    pos[10] = "VERB"
+    marker = Doc(vocab, words=words, heads=heads, deps=["dep"] * 7 + ["mark"] + ["dep"] * 5, pos=pos)
+    assert connector_split_points(marker, 0, len(marker)) == [7]
+    pronoun = Doc(vocab, words=words, heads=heads, deps=["dep"] * len(words), pos=pos)
+    assert connector_split_points(pronoun, 0, len(pronoun)) == []
@@ -0,0 +1,42 @@
+import pytest
+spacy = pytest.importorskip("spacy")
+from spacy.tokens import Doc
+from core.spacy_utils.split_by_mark import split_ranges_by_mark
+from core.spacy_utils.split_engine import _trim, _apply
+from core.spacy_utils.split_long_by_root import long_sentence_bounds
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+def _texts(doc, ranges):
+    return [doc[start:end].text.strip() for start, end in ranges]
+
+def test_mark_ranges_merge_continuations(nlp):
+    doc = nlp("We went home. And then... we slept. It rained! Done")
+    assert _texts(doc, split_ranges_by_mark(doc)) == ["We went home.", "And then... we slept.", "It rained!", "Done"]
+
+def test_mark_ranges_cover_the_doc(nlp):
+    doc = nlp("One. Two - three. Four?")
+    ranges = split_ranges_by_mark(doc)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(doc)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+def test_apply_trims_and_drops_empty_pieces(nlp):
+    doc = Doc(nlp.vocab, words=["  ", "a", "b", " ", "c", "  "], spaces=[False] * 6)
+    assert _trim(doc, 0, len(doc)) == (1, 5)
+    # a rule that cuts around the inner whitespace token and leaves an empty piece behind
+    rule = lambda doc, start, end: [(start, 3), (3, 4), (4, end)]
+    assert _apply(doc, [(0, len(doc))], rule) == [(1, 3), (4, 5)]
+
+def test_long_sentence_bounds_are_contiguous_and_long_enough(nlp):
+    words = [f"w{i}" for i in range(230)]
+    doc = Doc(nlp.vocab, words=words, pos=["VERB" if i % 7 == 6 else "NOUN" for i in range(230)])
+    bounds = long_sentence_bounds(doc)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(doc)
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    assert all(end - start >= 30 for start, end in bounds)
+    # past the first piece a cut may only follow a verb (or the sentence end)
+    assert all(doc[end - 1].pos_ == "VERB" or end == len(doc) for start, end in bounds if start > 0)
@@ -0,0 +1,67 @@
+import asyncio
+import core._3_2_split_meaning as split_meaning
+from core._3_2_split_meaning import find_split_positions, parallel_split_sentences, SplitItem
+
+def _lines(original, positions):
+    bounds = [0, *positions, len(original)]
+    return [original[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+
+def test_exact_split_maps_through_offsets():
+    original = "I went home, and then I slept for a very long time."
+    modified = "I went home,[br] and then I slept for a very long time."
+    assert _lines(original, find_split_positions(original, modified)) == [
+        "I went home,", "and then I slept for a very long time."]
+
+def test_case_and_whitespace_changes_still_align_exactly():
+    original = "The  QUICK brown fox jumps over the lazy dog"
+    modified = "the quick brown fox[br]jumps over the lazy dog"
+    assert _lines(original, find_split_positions(original, modified)) == [
+        "The  QUICK brown fox", "jumps over the lazy dog"]
+
+def test_dropped_punctuation_stays_on_the_left_line():
+    # the LLM removed the "." before [br]: the cut must come after it, not before it
+    original = "Hello, world. Foo bar baz."
+    assert find_split_positions(original, "hello world[br]foo bar baz") == [13]
+    assert _lines(original, [13]) == ["Hello, world.", "Foo bar baz."]
+
+def test_multiple_marks_are_monotonic():
+    original = "one two three, four five six. seven eight nine"
+    modified = "one two three[br]four five six.[br]seven eight nine"
+    positions = find_split_positions(original, modified)
+    assert positions == sorted(positions)
+    assert _lines(original, positions) == ["one two three,", "four five six.", "seven eight nine"]
+
+def test_cjk_without_spaces():
+    original = "今天天气很好，我们去公园散步吧。"
+    modified = "今天天气很好，[br]我们去公园散步吧。"
+    assert _lines(original, find_split_positions(original, modified)) == ["今天天气很好，", "我们去公园散步吧。"]
+
+async def _gather(coros):
+    return await asyncio.gather(*coros)
+
+def test_only_long_items_are_resent(monkeypatch):
+    sent = []
+
+    async def fake_split(text, num_parts, word_limit, index=-1, bypass_cache=False):
+        sent.append((text, bypass_cache))
+        words = text.split()
+        # "stuck" never gets split, everything else is cut in half
+        return text if "stuck" in words else " ".join(words[:len(words) // 2]) + "\n" + " ".join(words[len(words) // 2:])
+
+    monkeypatch.setattr(split_meaning, "split_sentence_async", fake_split)
+    monkeypatch.setattr(split_meaning, "run_tasks", lambda coros: asyncio.run(_gather(coros)))
+    monkeypatch.setattr(split_meaning, "token_counts", lambda texts, nlp: [len(t.split()) for t in texts])
+
+    texts = ["a b", "c d e f g h i j", "stuck x y z w v"]
+    items = [SplitItem(t, len(t.split())) for t in texts]
+    items, pending = parallel_split_sentences(items, 4, nlp=None)
+    assert pending
+    assert sent == [("c d e f g h i j", False), ("stuck x y z w v", False)]
+    assert [item.text for item in items] == ["a b", "c d e f", "g h i j", "stuck x y z w v"]
+
+    # the next round only re-sends what is still too long, and never accepts the same cached answer again
+    sent.clear()
+    items, pending = parallel_split_sentences(items, 4, nlp=None, max_attempts=2)
+    assert sent == [("stuck x y z w v", True)]
+    items, pending = parallel_split_sentences(items, 4, nlp=None, max_attempts=2)
+    assert not pending and items[-1].attempts == 2
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from core.tts_backend.time_stretch import wsola, stretch_file, read_audio, write_wav
+
+SR = 16000
+
+def _tone(seconds, freq=220.0, channels=1):
+    t = np.arange(int(seconds * SR)) / SR
+    return np.repeat((0.5 * np.sin(2 * np.pi * freq * t))[:, None], channels, axis=1).astype(np.float32)
+
+@pytest.mark.parametrize("target_len", [1, 7999, 12345, 16000, 24000, 31999])
+def test_exact_output_length(target_len):
+    out = wsola(_tone(1.0, channels=2), SR, target_len)
+    assert out.shape == (target_len, 2)
+    assert out.dtype == np.float32
+
+def test_identity_and_empty():
+    samples = _tone(0.5)
+    assert np.array_equal(wsola(samples, SR, len(samples)), samples)
+    assert wsola(samples, SR, 0).shape == (0, 1)
+    assert wsola(np.zeros((0, 2), dtype=np.float32), SR, 100).shape == (100, 2)
+
+def _dominant_freq(samples):
+    spectrum = np.abs(np.fft.rfft(samples[:, 0] * np.hanning(len(samples))))
+    return np.argmax(spectrum) * SR / len(samples)
+
+@pytest.mark.parametrize("speed", [0.8, 1.25, 1.6])
+def test_pitch_and_level_are_kept(speed):
+    samples = _tone(1.0)
+    out = wsola(samples, SR, int(len(samples) / speed))
+    body = out[800:-800]  # leave out the windowed edges
+    assert _dominant_freq(body) == pytest.approx(220.0, abs=5)
+    assert np.sqrt(np.mean(body ** 2)) == pytest.approx(0.5 / np.sqrt(2), rel=0.1)
+
+def test_stretch_file_duration(tmp_path):
+    src, dst = str(tmp_path / "in.wav"), str(tmp_path / "out.wav")
+    write_wav(src, _tone(1.0), SR)
+    assert stretch_file(src, dst, 1.25) == pytest.approx(0.8)
+    samples, sr = read_audio(dst)
+    assert sr == SR and len(samples) == int(round(SR / 1.25))
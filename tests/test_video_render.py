@@ -0,0 +1,37 @@
+import pytest
+from core.utils import video_render
+from core.utils.video_render import RenderTarget, build_render_cmd, fit_filter
+
+@pytest.fixture(autouse=True)
+def source_size(monkeypatch):
+    monkeypatch.setattr(video_render, "probe_video_size", lambda video_file: (1280, 720))
+
+def _option(cmd, name):
+    return cmd[cmd.index(name) + 1]
+
+def test_fit_filter():
+    assert fit_filter((1920, 1080), (1920, 1080)) == ""
+    assert fit_filter((1280, 720), (1920, 1080)) == \
+        "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2"
+
+def test_single_target_keeps_source_audio():
+    cmd = build_render_cmd("in.mp4", [RenderTarget("sub.mp4", "subtitles=a.srt")])
+    assert cmd[:4] == ['ffmpeg', '-y', '-i', 'in.mp4']
+    assert _option(cmd, '-filter_complex') == "[0:v]subtitles=a.srt[v0]"
+    assert cmd[-5:] == ['-map', '[v0]', '-map', '0:a?', 'sub.mp4']
+
+def test_one_decode_split_into_every_target():
+    targets = [
+        RenderTarget("sub.mp4", "subtitles=a.srt"),
+        RenderTarget("dub.mp4", "subtitles=b.srt", audio_inputs=["dub.mp3", "bgm.mp3"],
+                     audio_filter="{0}{1}amix=inputs=2", audio_args=['-c:a', 'aac']),
+    ]
+    cmd = build_render_cmd("in.mp4", targets, target_size=(1920, 1080), gpu=True)
+    # the video is decoded once: one video input, fitted once and split for both outputs
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-i'] == ["in.mp4", "dub.mp3", "bgm.mp3"]
+    graph = _option(cmd, '-filter_complex').split(';')
+    assert graph[0] == "[0:v]" + fit_filter((1280, 720), (1920, 1080)) + ",split=2[s0][s1]"
+    assert graph[1:] == ["[s0]subtitles=a.srt[v0]", "[s1]subtitles=b.srt[v1]", "[1:a][2:a]amix=inputs=2[a1]"]
+    sub, dub = cmd.index('sub.mp4'), cmd.index('dub.mp4')
+    assert cmd[sub - 6:sub] == ['-map', '[v0]', '-map', '0:a?', '-c:v', 'h264_nvenc']
+    assert cmd[sub + 1:dub] == ['-map', '[v1]', '-map', '[a1]', '-c:v', 'h264_nvenc', '-c:a', 'aac']